@@ -1,160 +1,1575 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+from flask import (Flask, render_template, stream_template, request, jsonify, redirect, url_for, flash,
+                   get_flashed_messages)
+import click
 import requests
+import urllib3
 import time
 import random
+import fcntl
+import hmac
+import http.cookiejar
 import json
+import math
 import os
-from datetime import datetime
+import queue
+import socket
+import sqlite3
+import struct
+import sys
+import threading
+import uuid
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from functools import partial, wraps
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse
+from markupsafe import Markup
+
+try:
+    import brotli
+except ImportError:  # Optional: responses fall back to gzip without it
+    brotli = None
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'your-secret-key-here')
 
-# Ensure leaderboard file exists
+# Legacy JSON leaderboard, imported into the database on first use
 LEADERBOARD_FILE = 'leaderboard.json'
 
-def load_leaderboard():
-    """Load leaderboard from JSON file"""
+# SQLite database holding the leaderboard and test jobs
+DATABASE_FILE = os.environ.get('DATABASE_FILE', 'tester.db')
+
+# Job queue sizing: worker threads per process, queued jobs accepted before
+# new submissions are turned away, and queued/running jobs allowed per user
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+JOB_QUEUE_SIZE = int(os.environ.get('JOB_QUEUE_SIZE', 20))
+MAX_JOBS_PER_USER = int(os.environ.get('MAX_JOBS_PER_USER', 2))
+
+# Jobs untouched for this long are treated as abandoned (e.g. their worker
+# process restarted), and finished jobs are pruned after JOB_RETENTION by a
+# background pass every JOB_PRUNE_INTERVAL seconds. The same pass touches
+# the jobs still waiting in the process's queue, so it must run well within
+# JOB_STALE_AFTER
+JOB_STALE_AFTER = timedelta(minutes=30)
+JOB_RETENTION = timedelta(days=1)
+JOB_PRUNE_INTERVAL = 600
+
+# Job event streams work as long polls: each response ends once it has
+# sent the events waiting, or after JOB_EVENTS_WAIT_SECONDS with none, and
+# the browser reconnects after JOB_EVENTS_RETRY_MS, resuming from its
+# Last-Event-ID. At most JOB_EVENTS_MAX_STREAMS are open per process, so
+# watchers cannot take every request thread; the rest are turned away and
+# poll /api/jobs/<id> instead.
+JOB_EVENTS_WAIT_SECONDS = 10
+JOB_EVENTS_RETRY_MS = 1000
+JOB_EVENTS_MAX_STREAMS = int(os.environ.get('JOB_EVENTS_MAX_STREAMS', 4))
+
+# Load tests make the server send traffic to whatever URL is submitted, so
+# they are off unless a deployment sets LOAD_TEST_ENABLED=1, and capped
+# to a few requests per second when on
+LOAD_TEST_ENABLED = os.environ.get('LOAD_TEST_ENABLED') == '1'
+LOAD_TEST_MAX_CONCURRENCY = int(os.environ.get('LOAD_TEST_MAX_CONCURRENCY', 4))
+LOAD_TEST_MAX_RATE = int(os.environ.get('LOAD_TEST_MAX_RATE', 5))
+LOAD_TEST_MAX_DURATION = int(os.environ.get('LOAD_TEST_MAX_DURATION', 10))
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    user_key TEXT NOT NULL,
+    user_name TEXT NOT NULL,
+    api_name TEXT NOT NULL,
+    api_url TEXT NOT NULL,
+    status TEXT NOT NULL,
+    rounds_total INTEGER NOT NULL,
+    progress TEXT NOT NULL DEFAULT '[]',
+    result TEXT,
+    error TEXT,
+    options TEXT,
+    url_key TEXT,
+    attached_to TEXT,
+    seed INTEGER,
+    created TEXT NOT NULL,
+    updated TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_user_status ON jobs (user_key, status);
+CREATE INDEX IF NOT EXISTS jobs_status_updated ON jobs (status, updated);
+CREATE TABLE IF NOT EXISTS job_events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    event TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS job_events_job ON job_events (job_id, seq);
+CREATE TABLE IF NOT EXISTS players (
+    user_key TEXT PRIMARY KEY,
+    user TEXT NOT NULL,
+    api_name TEXT NOT NULL,
+    results TEXT NOT NULL,
+    total_score INTEGER NOT NULL,
+    submission_count INTEGER NOT NULL,
+    first_submission TEXT,
+    last_updated TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS players_score ON players (total_score DESC);
+CREATE TABLE IF NOT EXISTS test_logs (
+    user_key TEXT PRIMARY KEY,
+    logs TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS submission_logs (
+    id INTEGER PRIMARY KEY,
+    job_id TEXT,
+    created TEXT NOT NULL,
+    logs BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS submission_logs_created ON submission_logs (created);
+CREATE TABLE IF NOT EXISTS history_rollups (
+    user_key TEXT NOT NULL,
+    day TEXT NOT NULL,
+    runs INTEGER NOT NULL,
+    best_score INTEGER NOT NULL,
+    score_sum INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    tests INTEGER NOT NULL,
+    latency_counts TEXT NOT NULL,
+    PRIMARY KEY (user_key, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS bulk_jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    report TEXT NOT NULL,
+    error TEXT,
+    created TEXT NOT NULL,
+    updated TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leaderboard_meta (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL,
+    modified REAL NOT NULL
+);
+INSERT OR IGNORE INTO leaderboard_meta (id, version, modified) VALUES (1, 0, strftime('%s', 'now'));
+'''
+
+# Columns added after a table was first created, as (table, column, type),
+# so databases from older versions are upgraded in place
+ADDED_COLUMNS = [
+    ('jobs', 'options', 'TEXT'),
+    ('jobs', 'url_key', 'TEXT'),
+    ('jobs', 'attached_to', 'TEXT'),
+    ('jobs', 'seed', 'INTEGER'),
+    ('players', 'logs_id', 'INTEGER'),
+    ('players', 'api_url', 'TEXT'),
+]
+
+# Indexes over ADDED_COLUMNS, created once those columns exist
+ADDED_INDEXES = '''
+CREATE INDEX IF NOT EXISTS jobs_url_status ON jobs (url_key, status);
+CREATE INDEX IF NOT EXISTS jobs_attached ON jobs (attached_to);
+CREATE INDEX IF NOT EXISTS players_logs ON players (logs_id);
+'''
+
+_db_local = threading.local()
+
+# Databases whose schema this process has already set up, so new threads
+# only need to connect
+_db_ready = set()
+_db_setup_lock = threading.Lock()
+
+# Compact test log format (see encode_test_logs). Enumerations are stored
+# as indexes into these tuples, so only ever append to them.
+LOG_FORMAT_VERSION = 1
+LOG_HEADER = struct.Struct('<BHII')
+LOG_ENDPOINTS = ('analyze-mood', 'detect-crisis', 'summarize')
+LOG_STATUSES = (None, 'CORRECT', 'INCORRECT', 'GOOD', 'INADEQUATE', 'ERROR', 'SKIPPED')
+LOG_SPEED_BONUSES = (None, 'FAST', 'MEDIUM')
+LOG_TIMING_FIELDS = ('dns', 'connect', 'tls', 'ttfb', 'body')
+# Log entry fields kept in the blob's value table, as indexes into it
+LOG_VALUE_FIELDS = ('text', 'expected', 'predicted', 'error', 'summary')
+
+# Per-entry columns as (name, array typecode), in stored order
+LOG_COLUMNS = (
+    [('endpoint', 'b'), ('test_num', 'B'), ('text_id', 'i'), ('status', 'b'), ('speed_bonus', 'b'),
+     ('flags', 'B'), ('latency', 'f')]
+    + [(field, 'f') for field in LOG_TIMING_FIELDS]
+    + [('request_bytes', 'I'), ('response_bytes', 'I')]
+    + [(field, 'i') for field in LOG_VALUE_FIELDS]
+)
+LOG_HAS_LATENCY, LOG_HAS_TIMING, LOG_CACHED, LOG_REUSED = 1, 2, 4, 8
+
+# Submission history: every run is appended as one compact JSON line to a
+# file per day, and folded into per-user daily rollups that trend queries read
+HISTORY_DIR = os.environ.get('HISTORY_DIR', DATABASE_FILE + '-history')
+HISTORY_MAX_DAYS = 365
+
+# Upper bounds, in seconds, of the probe latency histogram kept with each
+# rollup; percentiles are read off it. Slower probes share the last bucket.
+HISTORY_LATENCY_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 4.0, 6.0, 10.0, 15.0)
+
+# Leaderboard rows shown per page, and the most an API client may request at once
+LEADERBOARD_PAGE_SIZE = int(os.environ.get('LEADERBOARD_PAGE_SIZE', 50))
+LEADERBOARD_MAX_LIMIT = 1000
+
+# Rendered leaderboard table fragments by (version, offset, limit). Older
+# versions are dropped as soon as a newer one is rendered.
+LEADERBOARD_FRAGMENT_CACHE_SIZE = 32
+_leaderboard_fragments = OrderedDict()
+_leaderboard_fragments_lock = threading.Lock()
+
+# HTML, JSON and text responses at least COMPRESS_MIN_SIZE bytes long are
+# compressed with brotli (when installed) or gzip, as Accept-Encoding allows
+COMPRESS_MIMETYPES = {'text/html', 'text/plain', 'application/json'}
+COMPRESS_MIN_SIZE = 500
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Streamed pages are sent in chunks of roughly this many characters
+STREAM_CHUNK_SIZE = 16 * 1024
+
+# This process's ScoreIndex, kept current by its own writes and rebuilt
+# when another process changes the leaderboard
+_score_index = None
+_score_index_lock = threading.Lock()
+
+# In-process job queue feeding the worker threads
+_job_queue = queue.Queue(maxsize=JOB_QUEUE_SIZE)
+_job_workers = []
+_job_pruner = []
+_job_event_streams = threading.BoundedSemaphore(JOB_EVENTS_MAX_STREAMS)
+_job_submit_lock = threading.Lock()
+
+# Bulk re-testing: how many APIs are tested at once, and the most entries
+# one request may hold. The bulk API stays off until a token is configured.
+BULK_TEST_CONCURRENCY = int(os.environ.get('BULK_TEST_CONCURRENCY', 8))
+BULK_TEST_MAX_ENTRIES = 1000
+BULK_TEST_TOKEN = os.environ.get('BULK_TEST_TOKEN')
+
+# Maximum number of scored probes in flight against a single target host.
+# Kept at 1 by default: many participant APIs serve one request at a time,
+# so parallel probes would queue on their side and inflate the measured
+# latency (and cost them speed bonuses). Runs against different hosts
+# still go in parallel.
+TARGET_CONCURRENCY = int(os.environ.get('TARGET_CONCURRENCY', 1))
+
+ENDPOINTS = ["analyze-mood", "detect-crisis", "summarize"]
+
+# Test case corpus, generated by build_corpus.py
+CORPUS_FILE = os.environ.get('CORPUS_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_corpus.json'))
+
+# Cases drawn per label (per endpoint for summarize) in every round
+CASES_PER_LABEL = {"analyze-mood": 2, "detect-crisis": 2, "summarize": 3}
+
+# Run seeds are kept below 2**31 so they survive JavaScript and form round trips
+MAX_SEED = 2 ** 31
+
+# Request timeout per endpoint, in seconds (summarization gets longer)
+ENDPOINT_TIMEOUTS = {"analyze-mood": 10, "detect-crisis": 10, "summarize": 15}
+
+# (FAST, MEDIUM) speed bonus thresholds per endpoint, in seconds
+SPEED_THRESHOLDS = {"analyze-mood": (1.0, 2.0), "detect-crisis": (1.0, 2.0), "summarize": (2.0, 4.0)}
+
+# A run stops probing a target after this many consecutive probes get no
+# response at all (timeouts, refused connections), or once it has spent
+# TEST_RUN_BUDGET seconds probing it (time queued for a free slot behind
+# other runs does not count); its remaining probes are recorded as skipped
+BREAKER_FAILURE_LIMIT = int(os.environ.get('BREAKER_FAILURE_LIMIT', 5))
+TEST_RUN_BUDGET = float(os.environ.get('TEST_RUN_BUDGET', 180))
+
+# Once an endpoint has answered, its timeout drops to this multiple of the
+# slowest answer so far (never below the floor, in seconds, or the
+# endpoint's MEDIUM speed limit, so any answer that could earn a bonus is
+# still waited for; never above ENDPOINT_TIMEOUTS)
+ADAPTIVE_TIMEOUT_FACTOR = 4
+ADAPTIVE_TIMEOUT_FLOOR = 3.0
+
+# Response field holding the prediction for the classification endpoints
+RESPONSE_FIELDS = {"analyze-mood": "emotion", "detect-crisis": "crisis_detected"}
+
+# Per-host semaphores shared by every test run in this process
+_target_slots = {}
+_target_slots_lock = threading.Lock()
+
+# Keep-alive connections kept open per target host, and how long an unused
+# host session survives before it is closed
+SESSION_POOL_SIZE = int(os.environ.get('SESSION_POOL_SIZE', TARGET_CONCURRENCY))
+SESSION_IDLE_TIMEOUT = int(os.environ.get('SESSION_IDLE_TIMEOUT', 300))
+
+# Pooled sessions by target host, plus connection counts of evicted sessions
+_sessions = {}
+_session_stats = {}
+_sessions_lock = threading.Lock()
+
+# Connection phase timings for the probe running on the current thread
+_probe_timing = threading.local()
+
+# Optional cache of successful target responses by (URL, text), so repeat
+# probes within RESPONSE_CACHE_TTL seconds are not resent. Off when 0.
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 0))
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 8 * 1024 * 1024))
+
+_response_cache = OrderedDict()
+_response_cache_bytes = 0
+_response_cache_lock = threading.Lock()
+
+# Every process writes its metrics to <pid>.json here at most once per
+# METRICS_FLUSH_INTERVAL seconds, and at least once per METRICS_HEARTBEAT;
+# /metrics adds up the files of all workers. Files of finished processes
+# (or not rewritten for METRICS_STALE_AFTER, as PIDs get reused) are folded
+# into METRICS_RETIRED_FILE and deleted.
+METRICS_DIR = os.environ.get('METRICS_DIR', DATABASE_FILE + '-metrics')
+METRICS_FLUSH_INTERVAL = 1.0
+METRICS_HEARTBEAT = 30.0
+METRICS_STALE_AFTER = 300.0
+METRICS_RETIRED_FILE = 'retired.json'
+
+# Histogram bucket upper bounds, in seconds
+METRIC_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# name -> (type, help text). Gauges only count processes that are still alive.
+METRICS = {
+    'tester_test_endpoint_seconds': ('histogram', 'Duration of test_endpoint() runs'),
+    'tester_probe_seconds': ('histogram', 'Latency of probes sent to tested APIs, by endpoint and outcome'),
+    'tester_load_leaderboard_seconds': ('histogram', 'Time to read one leaderboard page from the database'),
+    'tester_save_leaderboard_seconds': ('histogram', 'Duration of transactions recording runs on the leaderboard'),
+    'tester_leaderboard_render_seconds': ('histogram', 'Time to build the /leaderboard page'),
+    'tester_tests_in_flight': ('gauge', 'test_endpoint() runs in progress'),
+    'tester_leaderboard_file_bytes': ('gauge', 'Size of the leaderboard database, including its write-ahead log'),
+    'tester_leaderboard_fragment_hits_total': ('counter', 'Leaderboard pages served from the rendered table cache'),
+    'tester_compressed_responses_total': ('counter', 'Responses compressed for the client, by encoding'),
+}
+
+# This process's metrics by (name, labels): a number for gauges and counters, or
+# per-bucket counts (the last one for +Inf) followed by the sum for histograms
+_metrics = {}
+_metrics_pid = None
+_metrics_dirty = False
+_metrics_written = 0.0
+_metrics_lock = threading.Lock()
+
+def record_metric(name, value, **labels):
+    """Observe a value in a histogram, or add it to a gauge or counter"""
+    global _metrics_pid, _metrics_dirty
+    key = (name, tuple(sorted(labels.items())))
+    with _metrics_lock:
+        if _metrics_pid != os.getpid():
+            # First use in this process (or in a forked worker, whose
+            # inherited values belong to its parent)
+            _metrics.clear()
+            _metrics_pid = os.getpid()
+            threading.Thread(target=metrics_flusher, name='metrics-flusher', daemon=True).start()
+        if METRICS[name][0] == 'histogram':
+            series = _metrics.setdefault(key, [0] * (len(METRIC_BUCKETS) + 2))
+            series[bisect_left(METRIC_BUCKETS, value)] += 1
+            series[-1] += value
+        else:
+            _metrics[key] = _metrics.get(key, 0) + value
+        _metrics_dirty = True
+
+@contextmanager
+def measuring(name):
+    """Record how long a with block takes in a histogram"""
+    start = time.perf_counter()
     try:
-        with open(LEADERBOARD_FILE, 'r') as f:
+        yield
+    finally:
+        record_metric(name, time.perf_counter() - start)
+
+def measured(name, in_flight=None):
+    """Decorator recording each call's duration in a histogram
+
+    in_flight names a gauge that counts calls currently running.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if in_flight:
+                record_metric(in_flight, 1)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record_metric(name, time.perf_counter() - start)
+                if in_flight:
+                    record_metric(in_flight, -1)
+        return wrapper
+    return decorator
+
+def metrics_snapshot():
+    """This process's metrics as JSON-friendly [name, labels, value] lists"""
+    with _metrics_lock:
+        return [[name, list(labels), value if isinstance(value, (int, float)) else list(value)]
+                for (name, labels), value in _metrics.items()]
+
+def write_metrics_file(path, snapshot):
+    """Replace a metrics file atomically, so readers never see half of one"""
+    with open(path + '.tmp', 'w') as f:
+        json.dump(snapshot, f)
+    os.replace(path + '.tmp', path)
+
+def flush_metrics():
+    """Write this process's metrics file if anything changed, or as a heartbeat"""
+    global _metrics_dirty, _metrics_written
+    with _metrics_lock:
+        if not _metrics_dirty and time.monotonic() - _metrics_written < METRICS_HEARTBEAT:
+            return
+        _metrics_dirty = False
+        _metrics_written = time.monotonic()
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    write_metrics_file(os.path.join(METRICS_DIR, f'{os.getpid()}.json'), metrics_snapshot())
+
+def metrics_flusher():
+    """Background loop flushing this process's metrics"""
+    try:
+        # A file under this PID already is left by a finished process that had it
+        retire_metrics_file(os.getpid())
+    except OSError:
+        app.logger.exception('Could not retire old metrics')
+    while True:
+        time.sleep(METRICS_FLUSH_INTERVAL)
+        try:
+            flush_metrics()
+        except OSError:
+            app.logger.exception('Could not write metrics')
+
+@contextmanager
+def metrics_dir_lock():
+    """Hold an exclusive lock on METRICS_DIR, across processes"""
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    with open(os.path.join(METRICS_DIR, '.lock'), 'w') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+def read_metrics_file(path):
+    """A metrics file's [name, labels, value] lists, or [] if it is missing or unreadable"""
+    try:
+        with open(path) as f:
             return json.load(f)
-    except FileNotFoundError:
+    except (OSError, ValueError):
         return []
 
+def retire_metrics_file(pid):
+    """Fold a finished process's histograms and counters into METRICS_RETIRED_FILE
+
+    Its gauges described it while it ran, so they are dropped. The
+    process's own file is deleted.
+    """
+    path = os.path.join(METRICS_DIR, f'{pid}.json')
+    if not os.path.exists(path):
+        return
+    retired_path = os.path.join(METRICS_DIR, METRICS_RETIRED_FILE)
+    with metrics_dir_lock():
+        if not os.path.exists(path):
+            return  # Another process retired it first
+        totals = {}
+        add_metrics(totals, read_metrics_file(retired_path))
+        add_metrics(totals, [item for item in read_metrics_file(path)
+                             if item[0] in METRICS and METRICS[item[0]][0] != 'gauge'])
+        write_metrics_file(retired_path, [[name, list(labels), value] for (name, labels), value in totals.items()])
+        os.remove(path)
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def add_metrics(totals, snapshot):
+    """Add a snapshot's [name, labels, value] lists into a totals dict"""
+    for name, labels, value in snapshot:
+        if name not in METRICS:
+            continue
+        key = (name, tuple(tuple(label) for label in labels))
+        if isinstance(value, list):
+            total = totals.setdefault(key, [0] * len(value))
+            totals[key] = [a + b for a, b in zip(total, value)]
+        else:
+            totals[key] = totals.get(key, 0) + value
+
+def collect_metrics():
+    """Add up the metrics of every process, using live values for this one"""
+    totals = {}
+    add_metrics(totals, metrics_snapshot())
+    if os.path.isdir(METRICS_DIR):
+        stale_before = time.time() - METRICS_STALE_AFTER
+        for filename in os.listdir(METRICS_DIR):
+            pid, ext = os.path.splitext(filename)
+            if ext != '.json' or not pid.isdigit() or int(pid) == os.getpid():
+                continue
+            path = os.path.join(METRICS_DIR, filename)
+            try:
+                # A live process rewrites its file every METRICS_HEARTBEAT, so
+                # an old file under a running PID belongs to an earlier process
+                if not process_alive(int(pid)) or os.path.getmtime(path) < stale_before:
+                    retire_metrics_file(int(pid))
+                    continue
+            except OSError:
+                continue
+            add_metrics(totals, read_metrics_file(path))
+        add_metrics(totals, read_metrics_file(os.path.join(METRICS_DIR, METRICS_RETIRED_FILE)))
+    return totals
+
+def format_labels(labels):
+    """Format (name, value) label pairs as {name="value",...}"""
+    if not labels:
+        return ''
+    pairs = []
+    for name, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+def render_metrics(totals):
+    """Render aggregated metrics in the Prometheus text exposition format"""
+    lines = []
+    for name, (metric_type, help_text) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        series = sorted((labels, value) for (series_name, labels), value in totals.items() if series_name == name)
+        if metric_type == 'gauge' and not series:
+            series = [((), 0)]
+        for labels, value in series:
+            if metric_type != 'histogram':
+                lines.append(f'{name}{format_labels(labels)} {value}')
+                continue
+            cumulative = 0
+            for bound, count in zip(METRIC_BUCKETS + ('+Inf',), value[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket{format_labels(labels + (("le", bound),))} {cumulative}')
+            lines.append(f'{name}_sum{format_labels(labels)} {value[-1]}')
+            lines.append(f'{name}_count{format_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+def get_db():
+    """Get this thread's SQLite connection, creating the schema on first use in this process"""
+    conn = getattr(_db_local, 'conn', None)
+    if conn is None or _db_local.path != DATABASE_FILE:
+        # Autocommit mode; multi-statement writes use explicit BEGIN IMMEDIATE
+        conn = sqlite3.connect(DATABASE_FILE, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA synchronous=NORMAL')
+        _db_local.conn = conn
+        _db_local.path = DATABASE_FILE
+        with _db_setup_lock:
+            if DATABASE_FILE not in _db_ready:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.executescript(SCHEMA)
+                add_missing_columns(conn)
+                conn.executescript(ADDED_INDEXES)
+                import_legacy_leaderboard()
+                _db_ready.add(DATABASE_FILE)
+    return conn
+
+def add_missing_columns(conn):
+    """Add any ADDED_COLUMNS missing from an older database"""
+    for table, column, column_type in ADDED_COLUMNS:
+        existing = {row['name'] for row in conn.execute(f'PRAGMA table_info({table})')}
+        if column not in existing:
+            try:
+                conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}')
+            except sqlite3.OperationalError:
+                # Another process added it first
+                pass
+
+@contextmanager
+def transaction():
+    """Run a block of statements as one atomic write transaction
+
+    Callables added to after_commit() run, in order, once it commits.
+    """
+    db = get_db()
+    db.execute('BEGIN IMMEDIATE')
+    _db_local.after_commit = []
+    try:
+        yield db
+    except BaseException:
+        db.execute('ROLLBACK')
+        raise
+    db.execute('COMMIT')
+    for callback in _db_local.after_commit:
+        callback()
+
+def after_commit(callback):
+    """Run callback once the current transaction() commits; dropped on rollback"""
+    _db_local.after_commit.append(callback)
+
+def import_legacy_leaderboard():
+    """Copy an existing leaderboard.json into an empty players table
+
+    The file is then renamed to leaderboard.json.imported, so later starts
+    do not look at it again.
+    """
+    if not os.path.exists(LEADERBOARD_FILE):
+        return
+    with transaction() as db:
+        if db.execute('SELECT 1 FROM players LIMIT 1').fetchone() is None:
+            with open(LEADERBOARD_FILE, 'r') as f:
+                for entry in json.load(f):
+                    write_player(db, entry)
+            mark_leaderboard_changed(db)
+    try:
+        os.replace(LEADERBOARD_FILE, LEADERBOARD_FILE + '.imported')
+    except OSError:
+        # Another process got there first, or the file cannot be moved;
+        # either way the players table is no longer empty
+        pass
+
+def mark_leaderboard_changed(db, score_change=None):
+    """Bump the leaderboard version so cached views are rebuilt
+
+    score_change is a single player's (old_score, new_score), with None for
+    a side where they had no row. Given that, this process's rank index is
+    updated in place once the transaction commits instead of rebuilt.
+    """
+    db.execute('UPDATE leaderboard_meta SET version = version + 1, modified = ? WHERE id = 1', (time.time(),))
+    if score_change is not None:
+        version = db.execute('SELECT version FROM leaderboard_meta').fetchone()[0]
+        after_commit(partial(apply_score_change, version, *score_change))
+
+def truncate(text, limit):
+    return text[:limit] + '...' if len(text) > limit else text
+
+def encode_test_logs(test_logs):
+    """Pack a run's test logs into a compressed, columnar blob
+
+    Each log entry becomes one row across typed arrays: enumerations as
+    small integers, latencies and timings as floats, and corpus texts as
+    their ids. Any other values (predictions, errors, summaries) are
+    stored once each in a JSON value table the columns point into.
+    """
+    values = []
+    value_index = {}
+    rounds = array('i')
+    scores = array('i')
+    sizes = array('I')
+    columns = {name: array(typecode) for name, typecode in LOG_COLUMNS}
+
+    for round_data in test_logs:
+        rounds.append(round_data['round'])
+        scores.append(round_data['score'])
+        sizes.append(len(round_data['logs']))
+        for entry in round_data['logs']:
+            timing = entry.get('timing') or {}
+            text_id = entry.get('text_id', -1)
+            columns['endpoint'].append(LOG_ENDPOINTS.index(entry['endpoint']) if 'endpoint' in entry else -1)
+            columns['test_num'].append(entry.get('test_num', 0))
+            columns['text_id'].append(text_id)
+            columns['status'].append(LOG_STATUSES.index(entry.get('status')))
+            columns['speed_bonus'].append(LOG_SPEED_BONUSES.index(entry.get('speed_bonus')))
+            columns['flags'].append(('latency' in entry) * LOG_HAS_LATENCY | bool(timing) * LOG_HAS_TIMING
+                                    | bool(entry.get('cached')) * LOG_CACHED
+                                    | bool(timing.get('reused')) * LOG_REUSED)
+            columns['latency'].append(entry.get('latency', 0))
+            for field in LOG_TIMING_FIELDS:
+                columns[field].append(timing.get(field, 0))
+            columns['request_bytes'].append(timing.get('request_bytes', 0))
+            columns['response_bytes'].append(timing.get('response_bytes', 0))
+            for field in LOG_VALUE_FIELDS:
+                # Corpus texts are rebuilt from text_id; -1 marks an absent field
+                if field not in entry or (field == 'text' and text_id >= 0):
+                    columns[field].append(-1)
+                    continue
+                key = json.dumps(entry[field])
+                if key not in value_index:
+                    value_index[key] = len(values)
+                    values.append(entry[field])
+                columns[field].append(value_index[key])
+
+    parts = [LOG_HEADER.pack(LOG_FORMAT_VERSION, CORPUS_VERSION, len(rounds), len(columns['flags']))]
+    for column in [rounds, scores, sizes] + [columns[name] for name, _ in LOG_COLUMNS]:
+        if sys.byteorder == 'big':
+            column.byteswap()
+        parts.append(column.tobytes())
+    parts.append(json.dumps(values, separators=(',', ':')).encode())
+    return zlib.compress(b''.join(parts))
+
+def decode_test_logs(blob):
+    """Unpack a blob from encode_test_logs() into the usual test_logs list"""
+    data = zlib.decompress(blob)
+    _, corpus_version, num_rounds, num_entries = LOG_HEADER.unpack_from(data)
+    offset = LOG_HEADER.size
+
+    def read(typecode, count):
+        nonlocal offset
+        column = array(typecode)
+        end = offset + column.itemsize * count
+        column.frombytes(data[offset:end])
+        if sys.byteorder == 'big':
+            column.byteswap()
+        offset = end
+        return column
+
+    rounds, scores, sizes = read('i', num_rounds), read('i', num_rounds), read('I', num_rounds)
+    columns = {name: read(typecode, num_entries) for name, typecode in LOG_COLUMNS}
+    values = json.loads(data[offset:])
+
+    test_logs = []
+    start = 0
+    for test_round, score, size in zip(rounds, scores, sizes):
+        logs = []
+        for row in range(start, start + size):
+            if columns['endpoint'][row] < 0:
+                # A failed round's error line
+                logs.append({'error': values[columns['error'][row]]})
+                continue
+            flags = columns['flags'][row]
+            text_id = columns['text_id'][row]
+            entry = {'endpoint': LOG_ENDPOINTS[columns['endpoint'][row]], 'test_num': columns['test_num'][row]}
+            if text_id >= 0:
+                entry['text_id'] = text_id
+                # Ids only name the same text within one corpus version
+                entry['text'] = (truncate(CORPUS_TEXTS[text_id], 50) if corpus_version == CORPUS_VERSION
+                                 else f'corpus v{corpus_version} text #{text_id}')
+            for field in LOG_VALUE_FIELDS:
+                if columns[field][row] >= 0:
+                    entry[field] = values[columns[field][row]]
+            if flags & LOG_CACHED:
+                entry['cached'] = True
+            if flags & LOG_HAS_LATENCY:
+                entry['latency'] = round(columns['latency'][row], 2)
+            if flags & LOG_HAS_TIMING:
+                entry['timing'] = {field: round(columns[field][row], 1) for field in LOG_TIMING_FIELDS}
+                entry['timing'].update(request_bytes=columns['request_bytes'][row],
+                                       response_bytes=columns['response_bytes'][row],
+                                       reused=bool(flags & LOG_REUSED))
+            if columns['status'][row]:
+                entry['status'] = LOG_STATUSES[columns['status'][row]]
+            if columns['speed_bonus'][row]:
+                entry['speed_bonus'] = LOG_SPEED_BONUSES[columns['speed_bonus'][row]]
+            logs.append(entry)
+        start += size
+        test_logs.append({'round': test_round, 'logs': logs, 'score': score})
+    return test_logs
+
+def store_test_logs(db, test_logs, job_id=None):
+    """Append a run's encoded test logs and return their id"""
+    cursor = db.execute('INSERT INTO submission_logs (job_id, created, logs) VALUES (?, ?, ?)',
+                        (job_id, datetime.now().isoformat(), encode_test_logs(test_logs)))
+    return cursor.lastrowid
+
+def fetch_test_logs(logs_id):
+    """Decode the stored test logs with the given id, or [] if there are none"""
+    row = get_db().execute('SELECT logs FROM submission_logs WHERE id = ?', (logs_id,)).fetchone()
+    return decode_test_logs(row['logs']) if row else []
+
+def write_player(db, entry):
+    """Insert or replace a player's summary row and test logs
+
+    The logs are either already stored (entry['logs_id']) or given as a
+    test_logs list to store.
+    """
+    user_key = entry['user'].lower().strip()
+    logs_id = entry.get('logs_id')
+    if logs_id is None:
+        logs_id = store_test_logs(db, entry.get('test_logs', []))
+    # Upsert rather than REPLACE so a player keeps their rowid (tie-break order)
+    db.execute(
+        'INSERT INTO players '
+        '(user_key, user, api_name, results, total_score, submission_count, first_submission, last_updated, '
+        'logs_id, api_url) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+        'ON CONFLICT (user_key) DO UPDATE SET user = excluded.user, api_name = excluded.api_name, '
+        'results = excluded.results, total_score = excluded.total_score, '
+        'submission_count = excluded.submission_count, first_submission = excluded.first_submission, '
+        'last_updated = excluded.last_updated, logs_id = excluded.logs_id, '
+        'api_url = COALESCE(excluded.api_url, players.api_url)',
+        (user_key, entry['user'], entry['api_name'], json.dumps(entry['results']),
+         entry['results']['total_score'], entry.get('submission_count', 1),
+         entry.get('first_submission'), entry.get('last_updated', datetime.now().isoformat()), logs_id,
+         entry.get('api_url')))
+    # Logs written before the compact format; superseded now
+    db.execute('DELETE FROM test_logs WHERE user_key = ?', (user_key,))
+
+def player_to_entry(row):
+    """Convert a players row into a leaderboard entry dict"""
+    entry = {
+        'user': row['user'],
+        'api_name': row['api_name'],
+        'results': json.loads(row['results']),
+        'submission_count': row['submission_count'],
+        'last_updated': row['last_updated'],
+        'first_submission': row['first_submission']
+    }
+    if 'encoded_logs' in row.keys():
+        entry['test_logs'] = row_test_logs(row)
+    return entry
+
+# Joins a player's stored test logs, as encoded_logs, or as legacy_logs
+# for players whose logs predate the compact format
+PLAYER_LOGS_JOIN = ('LEFT JOIN submission_logs ON submission_logs.id = players.logs_id '
+                    'LEFT JOIN test_logs ON test_logs.user_key = players.user_key')
+
+def row_test_logs(row):
+    """Decode the test logs of a players row selected with PLAYER_LOGS_JOIN"""
+    if row['encoded_logs'] is not None:
+        return decode_test_logs(row['encoded_logs'])
+    return json.loads(row['legacy_logs']) if row['legacy_logs'] else []
+
+def load_leaderboard(include_logs=True):
+    """Load the leaderboard, best score first"""
+    if include_logs:
+        query = ('SELECT players.*, submission_logs.logs AS encoded_logs, test_logs.logs AS legacy_logs '
+                 f'FROM players {PLAYER_LOGS_JOIN} ORDER BY total_score DESC, players.rowid')
+    else:
+        query = 'SELECT * FROM players ORDER BY total_score DESC, rowid'
+    return [player_to_entry(row) for row in get_db().execute(query)]
+
 def save_leaderboard(leaderboard):
-    """Save leaderboard to JSON file"""
-    with open(LEADERBOARD_FILE, 'w') as f:
-        json.dump(leaderboard, f, indent=4)
+    """Replace the whole leaderboard with the given entries"""
+    with transaction() as db:
+        db.execute('DELETE FROM players')
+        db.execute('DELETE FROM test_logs')
+        for entry in leaderboard:
+            write_player(db, entry)
+        mark_leaderboard_changed(db)
 
-def find_existing_player(leaderboard, user_name):
+def find_existing_player(db, user_name):
     """Find existing player in leaderboard (case-insensitive)"""
-    user_name_lower = user_name.lower().strip()
-    for i, entry in enumerate(leaderboard):
-        if entry['user'].lower().strip() == user_name_lower:
-            return i
-    return -1
-
-def update_or_add_player(leaderboard, user_name, api_name, results, test_logs):
-    """Update existing player or add new player to leaderboard"""
-    existing_index = find_existing_player(leaderboard, user_name)
+    return db.execute('SELECT * FROM players WHERE user_key = ?', (user_name.lower().strip(),)).fetchone()
+
+def update_or_add_player(db, user_name, api_name, results, test_logs, logs_id=None, api_url=None,
+                         replace=False):
+    """Update existing player or add new player to leaderboard
+
+    Call inside transaction() so the read and the write are atomic. The
+    run's logs are stored unless logs_id says they already are, and the
+    run is added to the submission history either way. With replace=True
+    the new score is kept even if it is lower ("replaced").
+    """
+    existing = find_existing_player(db, user_name)
+    append_history(db, user_name, results, test_logs)
+    if logs_id is None:
+        logs_id = store_test_logs(db, test_logs)
     
     new_entry = {
         'user': user_name.strip(),  # Use the current capitalization
         'api_name': api_name,
         'results': results,
-        'test_logs': test_logs,
+        'logs_id': logs_id,
+        'api_url': api_url,
         'submission_count': 1,
         'last_updated': datetime.now().isoformat()
     }
     
-    if existing_index >= 0:
-        # Update existing player
-        existing_entry = leaderboard[existing_index]
-        
+    if existing is not None:
         # Keep track of submission count
-        new_entry['submission_count'] = existing_entry.get('submission_count', 1) + 1
-        new_entry['first_submission'] = existing_entry.get('first_submission', existing_entry.get('results', {}).get('timestamp', datetime.now().isoformat()))
+        new_entry['submission_count'] = (existing['submission_count'] or 1) + 1
+        new_entry['first_submission'] = existing['first_submission'] or json.loads(existing['results']).get('timestamp', datetime.now().isoformat())
         
         # Update only if new score is better, or keep best score with latest info
-        if results['total_score'] > existing_entry['results']['total_score']:
+        score_change = (existing['total_score'], results['total_score'])
+        if results['total_score'] > existing['total_score']:
             # New score is better, update everything
-            leaderboard[existing_index] = new_entry
+            write_player(db, new_entry)
+            mark_leaderboard_changed(db, score_change)
             return True, "improved"
+        elif replace:
+            # Re-scoring, e.g. after the corpus changed: the latest run counts
+            write_player(db, new_entry)
+            mark_leaderboard_changed(db, score_change)
+            return True, "replaced"
         else:
             # Keep existing best score but update submission info
-            existing_entry['submission_count'] = new_entry['submission_count']
-            existing_entry['last_updated'] = new_entry['last_updated']
-            existing_entry['api_name'] = api_name  # Update API name in case it changed
+            # (and the API name and URL in case they changed)
+            db.execute('UPDATE players SET submission_count = ?, last_updated = ?, api_name = ?, '
+                       'api_url = COALESCE(?, api_url) WHERE user_key = ?',
+                       (new_entry['submission_count'], new_entry['last_updated'], api_name, api_url,
+                        existing['user_key']))
+            mark_leaderboard_changed(db, (existing['total_score'], existing['total_score']))
             return False, "not_improved"
     else:
         # Add new player
         new_entry['first_submission'] = results['timestamp']
-        leaderboard.append(new_entry)
+        write_player(db, new_entry)
+        mark_leaderboard_changed(db, (None, results['total_score']))
         return True, "new_player"
 
-def generate_test_cases():
-    """Generate random test cases for all three endpoints"""
-    # Test cases for analyze-mood endpoint
-    mood_cases = {
-        "happy": [
-            "I feel amazing today!",
-            "I'm so excited about this weekend",
-            "What a wonderful surprise, I'm thrilled!",
-            "This is the best day ever",
-            "I'm feeling incredibly joyful right now"
-        ],
-        "sad": [
-            "I'm feeling down today",
-            "This news has made me very unhappy",
-            "I can't stop crying about what happened",
-            "Everything seems so depressing lately",
-            "I'm really disappointed with the outcome"
-        ],
-        "angry": [
-            "This is absolutely infuriating",
-            "I'm so mad I could scream",
-            "Why does this always happen to me?!",
-            "They completely disrespected me",
-            "I can't believe how frustrating this is"
-        ],
-        "neutral": [
-            "The sky is blue today",
-            "I'm going to the store later",
-            "The meeting is scheduled for 3pm",
-            "The book has 250 pages",
-            "The car is parked outside"
-        ]
+def get_leaderboard_state():
+    """The stored leaderboard's 'version' and 'modified' time, for caching and revalidation"""
+    version, modified = get_db().execute('SELECT version, modified FROM leaderboard_meta').fetchone()
+    return {'version': version, 'modified': datetime.fromtimestamp(int(modified), timezone.utc)}
+
+@measured('tester_load_leaderboard_seconds')
+def load_leaderboard_page(offset, limit):
+    """Summary rows of one leaderboard page, best score first; limit None means the rest
+
+    Rows are read in order off the players_score index, so a page does not
+    cost more as the leaderboard grows (beyond the rows skipped by offset).
+    """
+    query = 'SELECT * FROM players ORDER BY total_score DESC, rowid LIMIT ? OFFSET ?'
+    return [player_to_entry(row) for row in get_db().execute(query, (-1 if limit is None else limit, offset))]
+
+def latency_counts(test_logs):
+    """Histogram of a run's probe latencies over HISTORY_LATENCY_BUCKETS"""
+    counts = [0] * len(HISTORY_LATENCY_BUCKETS)
+    for round_data in test_logs:
+        for entry in round_data['logs']:
+            if 'latency' in entry:
+                bucket = bisect_left(HISTORY_LATENCY_BUCKETS, entry['latency'])
+                counts[min(bucket, len(counts) - 1)] += 1
+    return counts
+
+def histogram_percentile(counts, pct):
+    """Upper bound of the latency bucket holding a percentile, or None if empty"""
+    total = sum(counts)
+    if not total:
+        return None
+    needed = math.ceil(pct / 100 * total)
+    seen = 0
+    for bound, count in zip(HISTORY_LATENCY_BUCKETS, counts):
+        seen += count
+        if seen >= needed:
+            return bound
+    return HISTORY_LATENCY_BUCKETS[-1]
+
+def rollup_run(rollup, record):
+    """Fold one history record into a day's rollup dict"""
+    rollup['runs'] += 1
+    rollup['best_score'] = max(rollup['best_score'], record['score'])
+    rollup['score_sum'] += record['score']
+    rollup['correct'] += record['correct']
+    rollup['tests'] += record['tests']
+    rollup['latency_counts'] = [a + b for a, b in zip(rollup['latency_counts'], record['latency'])]
+
+def empty_rollup(user_key, day):
+    return {'user_key': user_key, 'day': day, 'runs': 0, 'best_score': 0, 'score_sum': 0, 'correct': 0, 'tests': 0,
+            'latency_counts': [0] * len(HISTORY_LATENCY_BUCKETS)}
+
+def write_rollup(db, rollup):
+    db.execute('INSERT OR REPLACE INTO history_rollups '
+               '(user_key, day, runs, best_score, score_sum, correct, tests, latency_counts) '
+               'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+               (rollup['user_key'], rollup['day'], rollup['runs'], rollup['best_score'], rollup['score_sum'],
+                rollup['correct'], rollup['tests'], json.dumps(rollup['latency_counts'])))
+
+def append_history(db, user_name, results, test_logs):
+    """Record a run in the submission history
+
+    Call inside transaction(): the day's rollup is updated with the rest of
+    the write, and the run's line is appended to its day file on commit.
+    """
+    user_key = user_name.lower().strip()
+    day = results['timestamp'][:10]
+    record = {
+        'time': results['timestamp'],
+        'user': user_key,
+        'score': results['total_score'],
+        'correct': results['total_correct'],
+        'tests': results['total_tests'],
+        'rounds': results['rounds_tested'],
+        'latency': latency_counts(test_logs or [])
     }
-    
-    # Test cases for detect-crisis endpoint
-    crisis_cases = {
-        True: [
-            "I'm feeling hopeless and might hurt myself",
-            "I don't see any reason to continue living",
-            "Everyone would be better off without me",
-            "I've been thinking about ending it all",
-            "I can't take this pain anymore, I want to die"
-        ],
-        False: [
-            "I had a bad day but tomorrow will be better",
-            "This homework is really difficult",
-            "My friend didn't respond to my text",
-            "The traffic was terrible this morning",
-            "I spilled coffee on my new shirt"
-        ]
+    if 'seed' in results:
+        record['seed'] = results['seed']
+
+    row = db.execute('SELECT * FROM history_rollups WHERE user_key = ? AND day = ?', (user_key, day)).fetchone()
+    if row is None:
+        rollup = empty_rollup(user_key, day)
+    else:
+        rollup = dict(row)
+        rollup['latency_counts'] = json.loads(row['latency_counts'])
+    rollup_run(rollup, record)
+    write_rollup(db, rollup)
+    after_commit(partial(write_history_line, day, json.dumps(record, separators=(',', ':')) + '\n'))
+
+def write_history_line(day, line):
+    """Append a line to a day's history file
+
+    O_APPEND keeps lines from concurrent workers whole.
+    """
+    try:
+        os.makedirs(HISTORY_DIR, exist_ok=True)
+        fd = os.open(os.path.join(HISTORY_DIR, f'{day}.jsonl'), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode())
+        finally:
+            os.close(fd)
+    except OSError:
+        # The rollup is already committed; the raw line is only needed to rebuild it
+        app.logger.exception('Could not append to the submission history')
+
+def load_history(user_name, days):
+    """A player's daily trend for the last `days` days, oldest first"""
+    since = (datetime.now() - timedelta(days=days - 1)).date().isoformat()
+    rows = get_db().execute('SELECT * FROM history_rollups WHERE user_key = ? AND day >= ? ORDER BY day',
+                            (user_name.lower().strip(), since))
+    history = []
+    for row in rows:
+        history.append({
+            'day': row['day'],
+            'runs': row['runs'],
+            'best_score': row['best_score'],
+            'avg_score': round(row['score_sum'] / row['runs'], 1),
+            'accuracy': round(row['correct'] / row['tests'] * 100, 1) if row['tests'] else 0,
+            'p95_latency': histogram_percentile(json.loads(row['latency_counts']), 95)
+        })
+    return history
+
+def rebuild_history_rollups():
+    """Recompute every rollup from the history files; returns the number of runs read"""
+    rollups = {}
+    runs = 0
+    if os.path.isdir(HISTORY_DIR):
+        for filename in sorted(os.listdir(HISTORY_DIR)):
+            day, ext = os.path.splitext(filename)
+            if ext != '.jsonl':
+                continue
+            with open(os.path.join(HISTORY_DIR, filename)) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # A line cut short by a crash
+                    key = (record['user'], day)
+                    if key not in rollups:
+                        rollups[key] = empty_rollup(*key)
+                    rollup_run(rollups[key], record)
+                    runs += 1
+    with transaction() as db:
+        db.execute('DELETE FROM history_rollups')
+        for rollup in rollups.values():
+            write_rollup(db, rollup)
+    return runs
+
+class ScoreIndex:
+    """Number of players at each total score, in a Fenwick tree
+
+    Adding a player and looking up a rank are both O(log S) for scores up
+    to S, so neither needs the leaderboard sorted.
+    """
+
+    def __init__(self, version, size=1024):
+        self.version = version
+        self.players = 0
+        self.counts = [0] * size
+        self.tree = [0] * (size + 1)
+
+    def add(self, score, count=1):
+        """Add count players (remove them if negative) at a score"""
+        score = max(int(score), 0)
+        if score >= len(self.counts):
+            self.grow(score)
+        self.counts[score] += count
+        self.players += count
+        i = score + 1
+        while i < len(self.tree):
+            self.tree[i] += count
+            i += i & -i
+
+    def grow(self, score):
+        """Make room for a score, rebuilding the tree from the counts in O(S)"""
+        size = len(self.counts)
+        while size <= score:
+            size *= 2
+        self.counts += [0] * (size - len(self.counts))
+        self.tree = [0] + self.counts[:]
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                self.tree[parent] += self.tree[i]
+
+    def rank(self, score):
+        """Competition rank of a score ("1224"): one more than the players above it"""
+        i = min(max(int(score) + 1, 0), len(self.counts))
+        at_or_below = 0
+        while i > 0:
+            at_or_below += self.tree[i]
+            i -= i & -i
+        return self.players - at_or_below + 1
+
+def get_score_index():
+    """This process's ScoreIndex, rebuilt if it is behind the stored version"""
+    global _score_index
+    db = get_db()
+    with _score_index_lock:
+        # One read transaction, so the version and the counts come from the
+        # same snapshot: a write committing meanwhile is in neither, and is
+        # applied once by its apply_score_change()
+        db.execute('BEGIN')
+        try:
+            version = db.execute('SELECT version FROM leaderboard_meta').fetchone()[0]
+            if _score_index is None or _score_index.version < version:
+                index = ScoreIndex(version)
+                for score, count in db.execute('SELECT total_score, COUNT(*) FROM players GROUP BY total_score'):
+                    index.add(score, count)
+                _score_index = index
+        finally:
+            db.execute('COMMIT')
+        return _score_index
+
+def apply_score_change(version, old_score, new_score):
+    """Apply a committed score change to the rank index
+
+    Each change moves the index on by one version; if it is not at the
+    version just before, it missed a write and is left for a rebuild.
+    """
+    with _score_index_lock:
+        index = _score_index
+        if index is None or index.version != version - 1:
+            return
+        if old_score is not None:
+            index.add(old_score, -1)
+        if new_score is not None:
+            index.add(new_score)
+        index.version = version
+
+def player_rank(user_name):
+    """(rank, number of players) for a player, or None if they are not on the leaderboard"""
+    player = find_existing_player(get_db(), user_name)
+    if player is None:
+        return None
+    index = get_score_index()
+    return index.rank(player['total_score']), index.players
+
+def load_test_logs(user_names):
+    """Fetch stored test logs for the given players, keyed by user name"""
+    keys = {user_name.lower().strip(): user_name for user_name in user_names}
+    key_list = list(keys)
+    logs = {}
+    # Stay well under SQLite's bound parameter limit
+    for start in range(0, len(key_list), 500):
+        chunk = key_list[start:start + 500]
+        placeholders = ', '.join('?' * len(chunk))
+        query = (f'SELECT players.user_key, submission_logs.logs AS encoded_logs, test_logs.logs AS legacy_logs '
+                 f'FROM players {PLAYER_LOGS_JOIN} WHERE players.user_key IN ({placeholders})')
+        for row in get_db().execute(query, chunk):
+            logs[keys[row['user_key']]] = row_test_logs(row)
+    return logs
+
+def record_submission(user_name, api_name, results, test_logs):
+    """Atomically apply one test run to the leaderboard"""
+    with measuring('tester_save_leaderboard_seconds'), transaction() as db:
+        return update_or_add_player(db, user_name, api_name, results, test_logs)
+
+def load_corpus(path):
+    """Load the test corpus as (version, texts, index)
+
+    texts is one flat tuple, so a case is identified by its position in it.
+    index maps each endpoint to (expected, ids) pairs, where ids is the
+    range of positions holding that label's texts.
+    """
+    with open(path, encoding='utf-8') as f:
+        corpus = json.load(f)
+    texts = []
+    index = {}
+    for endpoint in ENDPOINTS:
+        index[endpoint] = []
+        for label, label_texts in corpus[endpoint].items():
+            if endpoint == 'detect-crisis':
+                expected = label == 'true'
+            elif endpoint == 'summarize':
+                expected = None
+            else:
+                expected = label
+            start = len(texts)
+            texts.extend(label_texts)
+            index[endpoint].append((expected, range(start, len(texts))))
+    return corpus['version'], tuple(texts), index
+
+CORPUS_VERSION, CORPUS_TEXTS, CORPUS_INDEX = load_corpus(CORPUS_FILE)
+
+def rounds_for_seed(seed):
+    """Number of test rounds a run with this seed gets"""
+    return random.Random(seed).randint(3, 7)
+
+def generate_test_cases(rng=random):
+    """Pick test cases for all three endpoints as lists of (text_id, expected)
+
+    Sampling from each label's id range costs O(k), however large the corpus.
+    """
+    return {
+        endpoint: [(text_id, expected)
+                   for expected, ids in CORPUS_INDEX[endpoint]
+                   for text_id in rng.sample(ids, min(CASES_PER_LABEL[endpoint], len(ids)))]
+        for endpoint in ENDPOINTS
     }
-    
-    # Test cases for summarize endpoint
-    summarize_cases = [
-        "Climate change is the long-term alteration in Earth's climate and weather patterns. It is caused by human activities, particularly the burning of fossil fuels, which leads to increased levels of greenhouse gases in the atmosphere. These gases trap heat, causing global warming. The effects of climate change include rising sea levels, extreme weather events, loss of biodiversity, and threats to food security.",
-        "Artificial intelligence refers to the simulation of human intelligence in machines that are programmed to think and learn like humans. It encompasses various technologies like machine learning, natural language processing, and computer vision. AI systems can analyze data, recognize patterns, make decisions, and improve over time based on experience. While AI offers numerous benefits in healthcare, transportation, and many other fields, it also raises concerns about privacy, security, and potential job displacement.",
-        "The history of space exploration began in the mid-20th century, with the Soviet Union launching the first artificial satellite, Sputnik 1, in 1957. This was followed by the first human in space, Yuri Gagarin, in 1961. The United States responded with the Apollo program, landing Neil Armstrong and Buzz Aldrin on the Moon in 1969. Since then, numerous countries have sent probes to explore the planets, and the International Space Station has been continuously occupied since 2000, representing a global collaboration in space research.",
-        "The internet evolved from ARPANET, a network created by the U.S. Department of Defense in the 1960s. It gained popularity in the 1990s with the creation of the World Wide Web. Today, the internet connects billions of devices worldwide, facilitating information sharing, communication, commerce, entertainment, and social networking. It has revolutionized how we work, learn, and interact with each other.",
-        "Renewable energy sources, such as solar, wind, hydroelectric, and geothermal power, are derived from naturally replenishing resources. Unlike fossil fuels, they produce minimal greenhouse gas emissions and have a smaller environmental impact. The adoption of renewable energy is growing globally as technology improves and costs decrease, playing a crucial role in addressing climate change and creating a sustainable energy future."
-    ]
-    
-    # Randomly select test cases for each endpoint
-    selected_mood_cases = []
-    for emotion, texts in mood_cases.items():
-        selected_texts = random.sample(texts, min(2, len(texts)))
-        for text in selected_texts:
-            selected_mood_cases.append((text, emotion))
-    
-    selected_crisis_cases = []
-    for is_crisis, texts in crisis_cases.items():
-        selected_texts = random.sample(texts, min(2, len(texts)))
-        for text in selected_texts:
-            selected_crisis_cases.append((text, is_crisis))
-    
-    selected_summarize_cases = random.sample(summarize_cases, min(3, len(summarize_cases)))
-    
+
+def get_target_slots(base_url):
+    """Get the semaphore limiting concurrent requests to a target host"""
+    host = urlparse(base_url).netloc.lower()
+    with _target_slots_lock:
+        if host not in _target_slots:
+            _target_slots[host] = threading.BoundedSemaphore(TARGET_CONCURRENCY)
+        return _target_slots[host]
+
+def target_host(base_url):
+    """Key identifying a target host (scheme, host and port)"""
+    parts = urlparse(base_url)
+    return f"{parts.scheme}://{parts.netloc.lower()}"
+
+def count_connections(session):
+    """Count connections opened and requests sent through a session"""
+    opened = sent = 0
+    for adapter in session.adapters.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+                sent += pool.num_requests
+    return opened, sent
+
+def evict_idle_sessions(now):
+    """Close host sessions unused for longer than SESSION_IDLE_TIMEOUT"""
+    for host, entry in list(_sessions.items()):
+        if now - entry['last_used'] > SESSION_IDLE_TIMEOUT:
+            opened, sent = count_connections(entry['session'])
+            totals = _session_stats.setdefault(host, {'opened': 0, 'reused': 0})
+            totals['opened'] += opened
+            totals['reused'] += sent - opened
+            entry['session'].close()
+            del _sessions[host]
+
+class TimedConnectionMixin:
+    """Record DNS lookup and TCP connect times of new connections
+
+    Phases are written to the calling thread's _probe_timing.phases dict,
+    so run_probe() can attach them to the probe that opened the connection.
+    """
+
+    def _new_conn(self):
+        phases = getattr(_probe_timing, 'phases', None)
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)
+        except socket.gaierror:
+            # Let urllib3 resolve again and raise its usual NameResolutionError
+            return super()._new_conn()
+        resolved = time.perf_counter()
+
+        # Connect straight to the first resolved address so the connect time
+        # excludes a second lookup; TLS still verifies against self.host
+        dns_host = self._dns_host
+        self._dns_host = addresses[0][4][0]
+        try:
+            sock = super()._new_conn()
+        except urllib3.exceptions.NewConnectionError:
+            if len(addresses) == 1:
+                raise
+            # Fall back to urllib3 trying every address
+            self._dns_host = dns_host
+            sock = super()._new_conn()
+        finally:
+            self._dns_host = dns_host
+
+        if phases is not None:
+            phases['dns'] = resolved - start
+            phases['connect'] = time.perf_counter() - resolved
+        return sock
+
+class TimedHTTPConnection(TimedConnectionMixin, urllib3.connection.HTTPConnection):
+    pass
+
+class TimedHTTPSConnection(TimedConnectionMixin, urllib3.connection.HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        phases = getattr(_probe_timing, 'phases', None)
+        if phases is not None:
+            # Whatever connect() spent beyond _new_conn() is the TLS handshake
+            elapsed = time.perf_counter() - start
+            phases['tls'] = max(elapsed - phases.get('dns', 0) - phases.get('connect', 0), 0)
+
+class TimedHTTPConnectionPool(urllib3.HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+class TimedHTTPSConnectionPool(urllib3.HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+class TimedHTTPAdapter(requests.adapters.HTTPAdapter):
+    """HTTPAdapter whose connections report per-phase connection timings"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool
+        }
+
+def get_session(base_url):
+    """Get the pooled keep-alive session for a target host"""
+    host = target_host(base_url)
+    now = time.monotonic()
+    with _sessions_lock:
+        evict_idle_sessions(now)
+        entry = _sessions.get(host)
+        if entry is None:
+            session = requests.Session()
+            # Sessions are shared by every run against the host, so cookies
+            # one target sets must not be replayed to later probes
+            session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+            adapter = TimedHTTPAdapter(pool_connections=1, pool_maxsize=SESSION_POOL_SIZE)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            entry = _sessions[host] = {'session': session, 'last_used': now}
+        entry['last_used'] = now
+        return entry['session']
+
+def session_pool_stats():
+    """Report connections newly opened versus reused for each target host"""
+    now = time.monotonic()
+    with _sessions_lock:
+        evict_idle_sessions(now)
+        stats = {}
+        for host, totals in _session_stats.items():
+            stats[host] = {'opened': totals['opened'], 'reused': totals['reused'], 'active': False}
+        for host, entry in _sessions.items():
+            opened, sent = count_connections(entry['session'])
+            host_stats = stats.setdefault(host, {'opened': 0, 'reused': 0})
+            host_stats['opened'] += opened
+            host_stats['reused'] += sent - opened
+            host_stats['active'] = True
+            host_stats['idle_seconds'] = round(now - entry['last_used'], 1)
+        return stats
+
+def get_cached_response(key):
+    """Look up a live cached target response, or None"""
+    global _response_cache_bytes
+    if RESPONSE_CACHE_TTL <= 0:
+        return None
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry is None:
+            return None
+        expires, size, value = entry
+        if expires < time.monotonic():
+            del _response_cache[key]
+            _response_cache_bytes -= size
+            return None
+        _response_cache.move_to_end(key)
+        return value
+
+def cache_response(key, value):
+    """Store a target response, evicting least recently used entries over the memory cap"""
+    global _response_cache_bytes
+    if RESPONSE_CACHE_TTL <= 0:
+        return
+    # Approximate footprint: URL, text and body plus a fixed per-entry overhead
+    size = len(key[0]) + len(key[1]) + len(value[1]) + 500
+    if size > RESPONSE_CACHE_MAX_BYTES:
+        return
+    with _response_cache_lock:
+        old = _response_cache.pop(key, None)
+        if old is not None:
+            _response_cache_bytes -= old[1]
+        _response_cache[key] = (time.monotonic() + RESPONSE_CACHE_TTL, size, value)
+        _response_cache_bytes += size
+        while _response_cache_bytes > RESPONSE_CACHE_MAX_BYTES:
+            _, (_, evicted_size, _) = _response_cache.popitem(last=False)
+            _response_cache_bytes -= evicted_size
+
+def probe_timing(phases, start, headers_received, finished, response, body):
+    """Break a probe's latency into phases, in milliseconds, plus body sizes
+
+    DNS, connect and TLS are zero when a pooled connection was reused.
+    """
+    dns = phases.get('dns', 0)
+    connect = phases.get('connect', 0)
+    tls = phases.get('tls', 0)
     return {
-        "analyze-mood": selected_mood_cases,
-        "detect-crisis": selected_crisis_cases,
-        "summarize": selected_summarize_cases
+        'dns': round(dns * 1000, 1),
+        'connect': round(connect * 1000, 1),
+        'tls': round(tls * 1000, 1),
+        'ttfb': round(max(headers_received - start - dns - connect - tls, 0) * 1000, 1),
+        'body': round((finished - headers_received) * 1000, 1),
+        'request_bytes': len(response.request.body or b''),
+        'response_bytes': len(body),
+        'reused': not phases
     }
 
-def test_endpoint(base_url, num_tests=5):
-    """Test all three API endpoints multiple times with random test cases"""
+class ProbeBreaker:
+    """Circuit breaker and adaptive timeouts shared by one test run's probes"""
+
+    def __init__(self, budget=TEST_RUN_BUDGET):
+        self.budget = budget
+        self.spent = 0.0
+        self.holding = 0
+        self.holding_since = None
+        self.failures = 0
+        self.slowest = {}
+        self.reason = None
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def charging(self):
+        """Charge time spent in this block to the budget; wrap each probe's hold on a target slot
+
+        Overlapping probes are charged once, and time spent waiting for a
+        slot (behind other runs) is not charged at all.
+        """
+        with self.lock:
+            if not self.holding:
+                self.holding_since = time.monotonic()
+            self.holding += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.holding -= 1
+                if not self.holding:
+                    self.spent += time.monotonic() - self.holding_since
+
+    def remaining(self):
+        """Seconds of budget left; call with the lock held"""
+        spent = self.spent
+        if self.holding:
+            spent += time.monotonic() - self.holding_since
+        return self.budget - spent
+
+    def skip_reason(self):
+        """Why the run's remaining probes should be skipped, or None"""
+        with self.lock:
+            if self.reason is None and self.remaining() <= 0:
+                self.reason = f'the run used up its {self.budget:g}s time budget'
+            return self.reason
+
+    def timeout(self, endpoint):
+        """Timeout for the next probe of an endpoint, in seconds"""
+        with self.lock:
+            timeout = ENDPOINT_TIMEOUTS[endpoint]
+            if endpoint in self.slowest:
+                timeout = min(timeout, max(ADAPTIVE_TIMEOUT_FLOOR, SPEED_THRESHOLDS[endpoint][1],
+                                           ADAPTIVE_TIMEOUT_FACTOR * self.slowest[endpoint]))
+            # Never wait past the end of the run's budget
+            return max(min(timeout, self.remaining()), 0.1)
+
+    def record(self, endpoint, latency):
+        """Record a probe's result: its latency, or None if nothing came back"""
+        with self.lock:
+            if latency is not None:
+                self.failures = 0
+                self.slowest[endpoint] = max(self.slowest.get(endpoint, 0), latency)
+                return
+            self.failures += 1
+            if self.failures >= BREAKER_FAILURE_LIMIT and self.reason is None:
+                self.reason = f'{self.failures} probes in a row got no response'
+
+def skip_probe(log_entry, outcome, reason):
+    """Record a probe the breaker did not send; like an error, it scores nothing"""
+    log_entry['status'] = 'SKIPPED'
+    log_entry['error'] = f'Skipped: {reason}'
+    return log_entry, outcome
+
+def run_probe(base_url, endpoint, test_num, text_id, expected=None, breaker=None):
+    """Send a single corpus test case to an endpoint and score the response"""
+    text = CORPUS_TEXTS[text_id]
+    outcome = {'score': 0, 'correct': False, 'fast': False, 'counted': False}
+    log_entry = {
+        'endpoint': endpoint,
+        'test_num': test_num,
+        'text_id': text_id,
+        'text': truncate(text, 50)
+    }
+    if endpoint != 'summarize':
+        log_entry['expected'] = expected
+
+    if breaker and breaker.skip_reason():
+        return skip_probe(log_entry, outcome, breaker.skip_reason())
+
+    cache_key = (base_url + endpoint, text)
+    start = None
+    try:
+        cached = get_cached_response(cache_key)
+        if cached:
+            # Replay the measurements of the original call along with its body
+            status_code, body, latency, timing = cached
+            log_entry['cached'] = True
+        else:
+            # Wait for a free slot before starting the clock so queueing
+            # behind other probes never counts against the target's latency
+            with get_target_slots(base_url), breaker.charging() if breaker else nullcontext():
+                # Check again, as the breaker may have tripped during the wait
+                if breaker and breaker.skip_reason():
+                    return skip_probe(log_entry, outcome, breaker.skip_reason())
+                timeout = breaker.timeout(endpoint) if breaker else ENDPOINT_TIMEOUTS[endpoint]
+                phases = _probe_timing.phases = {}
+                try:
+                    start = time.perf_counter()
+                    r = get_session(base_url).post(base_url + endpoint, json={"text": text},
+                                                   timeout=timeout, stream=True)
+                    headers_received = time.perf_counter()
+                    body = r.content
+                    finished = time.perf_counter()
+                finally:
+                    _probe_timing.phases = None
+                latency = finished - start
+            if breaker:
+                breaker.record(endpoint, latency)
+            status_code = r.status_code
+            timing = probe_timing(phases, start, headers_received, finished, r, body)
+            if status_code == 200:
+                cache_response(cache_key, (status_code, body, latency, timing))
+
+        log_entry['latency'] = round(latency, 2)
+        outcome['latency'] = latency
+        log_entry['timing'] = timing
+        outcome['counted'] = True
+
+        if status_code != 200:
+            log_entry['status'] = 'ERROR'
+            log_entry['error'] = f'Status: {status_code}'
+            return log_entry, outcome
+
+        data = json.loads(body)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        if start is not None and 'latency' not in outcome:
+            outcome['latency'] = time.perf_counter() - start
+        if breaker and isinstance(e, requests.exceptions.RequestException):
+            breaker.record(endpoint, None)
+        log_entry.pop('latency', None)
+        log_entry.pop('timing', None)
+        log_entry['status'] = 'ERROR'
+        log_entry['error'] = str(e)
+        return log_entry, outcome
+
+    if endpoint == 'summarize':
+        summary = data.get("summary")
+        log_entry['summary'] = truncate(summary, 100) if summary else summary
+
+        # For summary, we check if it's not empty and shorter than original text
+        passed = bool(summary) and len(summary) < len(text) * 0.8
+        log_entry['status'] = 'GOOD' if passed else 'INADEQUATE'
+    else:
+        predicted = data.get(RESPONSE_FIELDS[endpoint])
+        log_entry['predicted'] = predicted
+
+        passed = predicted == expected
+        log_entry['status'] = 'CORRECT' if passed else 'INCORRECT'
+
+    # Points for correct prediction
+    if passed:
+        outcome['score'] += 3
+        outcome['correct'] = True
+
+    # Bonus points for fast response
+    fast_limit, medium_limit = SPEED_THRESHOLDS[endpoint]
+    if latency < fast_limit:
+        outcome['score'] += 2
+        outcome['fast'] = True
+        log_entry['speed_bonus'] = 'FAST'
+    elif latency < medium_limit:
+        outcome['score'] += 1
+        log_entry['speed_bonus'] = 'MEDIUM'
+
+    return log_entry, outcome
+
+@measured('tester_test_endpoint_seconds', in_flight='tester_tests_in_flight')
+def test_endpoint(base_url, num_tests=5, on_event=None, seed=None):
+    """Test all three API endpoints multiple times with random test cases
+
+    With a seed, every round's cases are derived from it, so the same seed
+    picks the same cases again (for the same corpus version). A target that
+    stops responding, or a run over TEST_RUN_BUDGET, trips the run's
+    breaker and the remaining probes are skipped.
+
+    If given, on_event(event, data) is called with a 'log' event for each
+    log entry as soon as its probe finishes (from the probing thread), and
+    a 'round' event with each round's summary once the round is complete.
+    """
     total_score = 0
     all_results = []
     test_logs = []
@@ -162,234 +1577,207 @@ def test_endpoint(base_url, num_tests=5):
     # Ensure base_url ends with a slash
     if not base_url.endswith('/'):
         base_url += '/'
-    
-    endpoints = ["analyze-mood", "detect-crisis", "summarize"]
-    
-    for test_round in range(1, num_tests + 1):
-        test_cases = generate_test_cases()
-        round_score = 0
-        correct_predictions = 0
-        fast_responses = 0
-        total_tests = 0
-        round_logs = []
-        
-        try:
-            # Test analyze-mood endpoint
-            for i, (text, expected_emotion) in enumerate(test_cases["analyze-mood"], 1):
-                start = time.time()
-                try:
-                    url = base_url + "analyze-mood"
-                    r = requests.post(url, json={"text": text}, timeout=10)
-                    latency = time.time() - start
-                    
-                    log_entry = {
-                        'endpoint': 'analyze-mood',
-                        'test_num': i,
-                        'text': text[:50] + '...' if len(text) > 50 else text,
-                        'expected': expected_emotion,
-                        'latency': round(latency, 2)
-                    }
-                    total_tests += 1
-                    
-                    if r.status_code != 200:
-                        log_entry['status'] = 'ERROR'
-                        log_entry['error'] = f'Status: {r.status_code}'
-                        round_logs.append(log_entry)
-                        continue
-                    
-                    data = r.json()
-                    predicted = data.get("emotion")
-                    log_entry['predicted'] = predicted
-                    
-                    # Points for correct prediction
-                    if predicted == expected_emotion:
-                        round_score += 3
-                        correct_predictions += 1
-                        log_entry['status'] = 'CORRECT'
-                    else:
-                        log_entry['status'] = 'INCORRECT'
-                    
-                    # Bonus points for fast response
-                    if latency < 1.0:
-                        round_score += 2
-                        fast_responses += 1
-                        log_entry['speed_bonus'] = 'FAST'
-                    elif latency < 2.0:
-                        round_score += 1
-                        log_entry['speed_bonus'] = 'MEDIUM'
-                    
-                    round_logs.append(log_entry)
-                    
-                except requests.exceptions.RequestException as e:
-                    log_entry = {
-                        'endpoint': 'analyze-mood',
-                        'test_num': i,
-                        'text': text[:50] + '...' if len(text) > 50 else text,
-                        'expected': expected_emotion,
-                        'status': 'ERROR',
-                        'error': str(e)
-                    }
-                    round_logs.append(log_entry)
-            
-            # Test detect-crisis endpoint
-            for i, (text, expected_crisis) in enumerate(test_cases["detect-crisis"], 1):
-                start = time.time()
-                try:
-                    url = base_url + "detect-crisis"
-                    r = requests.post(url, json={"text": text}, timeout=10)
-                    latency = time.time() - start
-                    
-                    log_entry = {
-                        'endpoint': 'detect-crisis',
-                        'test_num': i,
-                        'text': text[:50] + '...' if len(text) > 50 else text,
-                        'expected': expected_crisis,
-                        'latency': round(latency, 2)
-                    }
-                    total_tests += 1
-                    
-                    if r.status_code != 200:
-                        log_entry['status'] = 'ERROR'
-                        log_entry['error'] = f'Status: {r.status_code}'
-                        round_logs.append(log_entry)
-                        continue
-                    
-                    data = r.json()
-                    predicted = data.get("crisis_detected")
-                    log_entry['predicted'] = predicted
-                    
-                    # Points for correct prediction
-                    if predicted == expected_crisis:
-                        round_score += 3
-                        correct_predictions += 1
-                        log_entry['status'] = 'CORRECT'
-                    else:
-                        log_entry['status'] = 'INCORRECT'
-                    
-                    # Bonus points for fast response
-                    if latency < 1.0:
-                        round_score += 2
-                        fast_responses += 1
-                        log_entry['speed_bonus'] = 'FAST'
-                    elif latency < 2.0:
-                        round_score += 1
-                        log_entry['speed_bonus'] = 'MEDIUM'
-                    
-                    round_logs.append(log_entry)
-                    
-                except requests.exceptions.RequestException as e:
-                    log_entry = {
-                        'endpoint': 'detect-crisis',
-                        'test_num': i,
-                        'text': text[:50] + '...' if len(text) > 50 else text,
-                        'expected': expected_crisis,
-                        'status': 'ERROR',
-                        'error': str(e)
-                    }
-                    round_logs.append(log_entry)
-            
-            # Test summarize endpoint
-            for i, text in enumerate(test_cases["summarize"], 1):
-                start = time.time()
+
+    breaker = ProbeBreaker()
+
+    def emit_log(test_round, future):
+        if future.exception() is None:
+            on_event('log', dict(future.result()[0], round=test_round))
+
+    # Every probe of every round is submitted up front; the per-target
+    # semaphore in run_probe() decides how many actually run at once
+    with ThreadPoolExecutor(max_workers=TARGET_CONCURRENCY) as executor:
+        rounds = []
+        for test_round in range(1, num_tests + 1):
+            rng = random if seed is None else random.Random(seed * 1000 + test_round)
+            test_cases = generate_test_cases(rng)
+            futures = []
+            for endpoint in ENDPOINTS:
+                for i, (text_id, expected) in enumerate(test_cases[endpoint], 1):
+                    future = executor.submit(run_probe, base_url, endpoint, i, text_id, expected, breaker)
+                    if on_event:
+                        future.add_done_callback(partial(emit_log, test_round))
+                    futures.append(future)
+            rounds.append((test_round, futures))
+
+        for test_round, futures in rounds:
+            round_score = 0
+            correct_predictions = 0
+            fast_responses = 0
+            total_tests = 0
+            skipped = 0
+            round_logs = []
+            round_error = None
+
+            # Collect in submission order so logs read the same as a serial run
+            for future in futures:
                 try:
-                    url = base_url + "summarize"
-                    r = requests.post(url, json={"text": text}, timeout=15)  # Longer timeout for summarization
-                    latency = time.time() - start
-                    
-                    log_entry = {
-                        'endpoint': 'summarize',
-                        'test_num': i,
-                        'text': text[:50] + '...' if len(text) > 50 else text,
-                        'latency': round(latency, 2)
-                    }
-                    total_tests += 1
-                    
-                    if r.status_code != 200:
-                        log_entry['status'] = 'ERROR'
-                        log_entry['error'] = f'Status: {r.status_code}'
-                        round_logs.append(log_entry)
-                        continue
-                    
-                    data = r.json()
-                    summary = data.get("summary")
-                    log_entry['summary'] = summary[:100] + '...' if summary and len(summary) > 100 else summary
-                    
-                    # For summary, we check if it's not empty and shorter than original text
-                    if summary and len(summary) < len(text) * 0.8:
-                        round_score += 3
-                        correct_predictions += 1
-                        log_entry['status'] = 'GOOD'
-                    else:
-                        log_entry['status'] = 'INADEQUATE'
-                    
-                    # Bonus points for fast response (higher threshold for summarization)
-                    if latency < 2.0:
-                        round_score += 2
-                        fast_responses += 1
-                        log_entry['speed_bonus'] = 'FAST'
-                    elif latency < 4.0:
-                        round_score += 1
-                        log_entry['speed_bonus'] = 'MEDIUM'
-                    
-                    round_logs.append(log_entry)
-                    
-                except requests.exceptions.RequestException as e:
-                    log_entry = {
-                        'endpoint': 'summarize',
-                        'test_num': i,
-                        'text': text[:50] + '...' if len(text) > 50 else text,
-                        'status': 'ERROR',
-                        'error': str(e)
-                    }
-                    round_logs.append(log_entry)
-                    
-        except Exception as e:
-            round_logs.append({'error': f'Round {test_round} failed: {str(e)}'})
-        
-        total_score += round_score
-        all_results.append({
-            'round': test_round,
-            'score': round_score,
-            'correct': correct_predictions,
-            'total_tests': total_tests,
-            'fast_responses': fast_responses
-        })
-        test_logs.append({
-            'round': test_round,
-            'logs': round_logs,
-            'score': round_score
-        })
+                    log_entry, outcome = future.result()
+                except Exception as e:
+                    round_error = e
+                    continue
+                if 'latency' in outcome:
+                    record_metric('tester_probe_seconds', outcome['latency'],
+                                  endpoint=log_entry['endpoint'], outcome=log_entry['status'])
+                round_score += outcome['score']
+                correct_predictions += outcome['correct']
+                fast_responses += outcome['fast']
+                total_tests += outcome['counted']
+                skipped += log_entry['status'] == 'SKIPPED'
+                round_logs.append(log_entry)
+
+            if round_error is not None:
+                round_logs.append({'error': f'Round {test_round} failed: {str(round_error)}'})
+
+            total_score += round_score
+            all_results.append({
+                'round': test_round,
+                'score': round_score,
+                'correct': correct_predictions,
+                'total_tests': total_tests,
+                'fast_responses': fast_responses,
+                'skipped': skipped
+            })
+            test_logs.append({
+                'round': test_round,
+                'logs': round_logs,
+                'score': round_score
+            })
+            if on_event:
+                on_event('round', all_results[-1])
     
     return total_score, all_results, test_logs
 
 @app.route('/')
 def index():
-    return render_template('index.html')
+    load_test_max = {
+        'concurrency': LOAD_TEST_MAX_CONCURRENCY,
+        'rate': LOAD_TEST_MAX_RATE,
+        'duration': LOAD_TEST_MAX_DURATION
+    } if LOAD_TEST_ENABLED else None
+    return render_template('index.html', load_test_max=load_test_max)
 
-@app.route('/test', methods=['POST'])
-def test_api():
-    user_name = request.form.get('user_name', '').strip()
-    api_url = request.form.get('api_url', '').strip()
-    api_name = request.form.get('api_name', 'User API').strip()
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(int(math.ceil(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[index]
 
-    if not user_name or not api_url:
-        flash('Please provide both your name and API URL', 'error')
-        return redirect(url_for('index'))
+def load_test_endpoint(base_url, endpoint, concurrency, rate, duration):
+    """Drive one endpoint at a fixed request rate and concurrency for a set duration"""
+    texts = [CORPUS_TEXTS[text_id] for text_id, _ in generate_test_cases()[endpoint]]
+    url = base_url + endpoint
+    latencies = []
+    errors = 0
+    timeouts = 0
+    sent = 0
+    lock = threading.Lock()
 
-    if not api_url.startswith(('http://', 'https://')):
-        flash('Invalid URL format. Please include http:// or https://', 'error')
-        return redirect(url_for('index'))
+    # A dedicated session sized to the requested concurrency keeps the load
+    # test from starving (or being throttled by) the regular probe pool
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
 
-    # Test the API
-    num_test_rounds = random.randint(3, 7)
-    total_score, detailed_results, test_logs = test_endpoint(api_url, num_test_rounds)
+    start = time.perf_counter()
+    deadline = start + duration
 
+    def worker():
+        nonlocal errors, timeouts, sent
+        while True:
+            # Requests are scheduled at fixed intervals of 1/rate seconds
+            with lock:
+                scheduled = start + sent / rate
+                if scheduled >= deadline:
+                    return
+                text = texts[sent % len(texts)]
+                sent += 1
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            request_start = time.perf_counter()
+            try:
+                r = session.post(url, json={"text": text}, timeout=ENDPOINT_TIMEOUTS[endpoint])
+                latency = time.perf_counter() - request_start
+                with lock:
+                    latencies.append(latency)
+                    if r.status_code != 200:
+                        errors += 1
+            except requests.exceptions.Timeout:
+                with lock:
+                    timeouts += 1
+            except requests.exceptions.RequestException:
+                with lock:
+                    errors += 1
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(worker)
+    elapsed = time.perf_counter() - start
+    session.close()
+
+    latencies.sort()
+    completed = len(latencies)
+    return {
+        'requests': sent,
+        'completed': completed,
+        'rps': round(completed / elapsed, 2) if elapsed > 0 else 0,
+        'p50': round(percentile(latencies, 50), 3) if latencies else None,
+        'p90': round(percentile(latencies, 90), 3) if latencies else None,
+        'p99': round(percentile(latencies, 99), 3) if latencies else None,
+        'max': round(latencies[-1], 3) if latencies else None,
+        'errors': errors,
+        'timeouts': timeouts,
+        'error_rate': round((errors + timeouts) / sent * 100, 1) if sent else 0
+    }
+
+def run_load_test(base_url, concurrency, rate, duration):
+    """Load test each endpoint in turn; latencies are in seconds, error_rate in %"""
+    if not base_url.endswith('/'):
+        base_url += '/'
+    report = {'concurrency': concurrency, 'rate': rate, 'duration': duration, 'endpoints': {}}
+    for endpoint in ENDPOINTS:
+        report['endpoints'][endpoint] = load_test_endpoint(base_url, endpoint, concurrency, rate, duration)
+    return report
+
+def load_test_options(form):
+    """Read load test settings from a submission, or None if none were requested"""
+    options = form.get('load_test')
+    if not options:
+        return None
+    if not isinstance(options, dict):
+        # HTML form: a checkbox plus separate fields
+        options = {
+            'concurrency': form.get('load_concurrency'),
+            'rate': form.get('load_rate'),
+            'duration': form.get('load_duration')
+        }
+
+    def bounded(name, default, maximum):
+        try:
+            value = int(options.get(name) or default)
+        except (TypeError, ValueError):
+            value = default
+        return min(max(value, 1), maximum)
+
+    return {
+        'concurrency': bounded('concurrency', 2, LOAD_TEST_MAX_CONCURRENCY),
+        'rate': bounded('rate', 5, LOAD_TEST_MAX_RATE),
+        'duration': bounded('duration', 10, LOAD_TEST_MAX_DURATION)
+    }
+
+def summarize_results(total_score, detailed_results, num_test_rounds):
+    """Build the results summary for a finished test run"""
     # Calculate statistics
     avg_score_per_round = total_score / num_test_rounds if num_test_rounds > 0 else 0
     total_correct = sum(r['correct'] for r in detailed_results)
     total_tests = sum(r['total_tests'] for r in detailed_results)
     accuracy = (total_correct / total_tests * 100) if total_tests > 0 else 0
     total_fast = sum(r['fast_responses'] for r in detailed_results)
+    total_skipped = sum(r.get('skipped', 0) for r in detailed_results)
 
     # Performance rating
     if accuracy >= 90:
@@ -401,8 +1789,7 @@ def test_api():
     else:
         rating = "❌ NEEDS IMPROVEMENT"
 
-    # Create results dictionary
-    results = {
+    return {
         'total_score': total_score,
         'rounds_tested': num_test_rounds,
         'avg_score': round(avg_score_per_round, 1),
@@ -410,14 +1797,598 @@ def test_api():
         'total_correct': total_correct,
         'total_tests': total_tests,
         'fast_responses': total_fast,
+        'skipped': total_skipped,
         'rating': rating,
         'timestamp': datetime.now().isoformat()
     }
 
-    # Update or add to leaderboard
-    leaderboard = load_leaderboard()
-    score_updated, update_type = update_or_add_player(leaderboard, user_name, api_name, results, test_logs)
-    save_leaderboard(leaderboard)
+def job_to_dict(row):
+    """Convert a jobs table row into the /api/jobs response shape"""
+    progress = json.loads(row['progress'])
+    job = {
+        'id': row['id'],
+        'status': row['status'],
+        'user': row['user_name'],
+        'api_name': row['api_name'],
+        'rounds_total': row['rounds_total'],
+        'rounds_completed': len(progress),
+        'progress': progress,
+        'created': row['created'],
+        'updated': row['updated']
+    }
+    if row['seed'] is not None:
+        job['seed'] = row['seed']
+    if row['options']:
+        job['options'] = json.loads(row['options'])
+    if row['attached_to']:
+        job['attached_to'] = row['attached_to']
+    if row['result']:
+        job.update(json.loads(row['result']))
+    if row['error']:
+        job['error'] = row['error']
+    return job
+
+def get_job(job_id):
+    """Fetch a job by id, or None if it does not exist"""
+    row = get_db().execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+    if row is not None and fail_stale_job(row):
+        row = get_db().execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+    return job_to_dict(row) if row else None
+
+def fail_stale_job(row):
+    """Mark a queued or running job failed if nothing has touched it for JOB_STALE_AFTER
+
+    Whatever was running it is gone (e.g. its process restarted), so
+    nothing else would ever finish it. Returns whether the job was failed.
+    """
+    now = datetime.now()
+    cutoff = (now - JOB_STALE_AFTER).isoformat()
+    if row['status'] not in ('queued', 'running') or row['updated'] >= cutoff:
+        return False
+    error = 'The test run was interrupted. Please submit your API again.'
+    with transaction() as db:
+        failed = db.execute("UPDATE jobs SET status = 'failed', error = ?, updated = ? "
+                            "WHERE id = ? AND status IN ('queued', 'running') AND updated < ?",
+                            (error, now.isoformat(), row['id'], cutoff)).rowcount
+        if failed:
+            add_job_event(row['id'], 'failed', {'error': error})
+    return True
+
+def update_job(job_id, followers=False, **fields):
+    """Update columns of a job row and bump its updated timestamp
+
+    With followers=True, jobs attached to this one are updated too.
+    """
+    fields['updated'] = datetime.now().isoformat()
+    columns = ', '.join(f'{name} = ?' for name in fields)
+    if followers:
+        get_db().execute(f'UPDATE jobs SET {columns} WHERE id = ? OR attached_to = ?', (*fields.values(), job_id, job_id))
+    else:
+        get_db().execute(f'UPDATE jobs SET {columns} WHERE id = ?', (*fields.values(), job_id))
+
+def add_job_event(job_id, event, data, followers=False):
+    """Append an event to a job's stream for /api/jobs/<id>/events
+
+    With followers=True, jobs attached to this one get the event too.
+    """
+    if followers:
+        get_db().execute('INSERT INTO job_events (job_id, event, data) '
+                         'SELECT id, ?, ? FROM jobs WHERE id = ? OR attached_to = ?',
+                         (event, json.dumps(data), job_id, job_id))
+    else:
+        get_db().execute('INSERT INTO job_events (job_id, event, data) VALUES (?, ?, ?)',
+                         (job_id, event, json.dumps(data)))
+
+def stream_job_events(job_id, after=0):
+    """Yield a job's new events as Server-Sent Events, long-poll style
+
+    The stream ends as soon as it has sent the events waiting (or the first
+    to arrive within JOB_EVENTS_WAIT_SECONDS), or when the job finishes,
+    so it never holds a request thread for long.
+    """
+    db = get_db()
+    deadline = time.monotonic() + JOB_EVENTS_WAIT_SECONDS
+    yield f'retry: {JOB_EVENTS_RETRY_MS}\n\n'
+    while True:
+        # Read the status first: final events are committed together with
+        # it, so a finished job's events are all visible to the query below
+        job = db.execute('SELECT id, status, updated FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if job is not None and fail_stale_job(job):
+            # Its 'failed' event is picked up on the next pass
+            continue
+        rows = db.execute('SELECT seq, event, data FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq',
+                          (job_id, after)).fetchall()
+        for row in rows:
+            after = row['seq']
+            yield f"id: {row['seq']}\nevent: {row['event']}\ndata: {row['data']}\n\n"
+            if row['event'] in ('done', 'failed'):
+                return
+
+        if rows or job is None or job['status'] not in ('queued', 'running') or time.monotonic() >= deadline:
+            return
+        time.sleep(0.5)
+
+def start_job_workers():
+    """Start this process's job worker threads and pruner if they are not running yet"""
+    with _job_submit_lock:
+        while len(_job_workers) < JOB_WORKERS:
+            worker = threading.Thread(target=job_worker, name=f'job-worker-{len(_job_workers) + 1}', daemon=True)
+            worker.start()
+            _job_workers.append(worker)
+        if not _job_pruner:
+            pruner = threading.Thread(target=job_pruner, name='job-pruner', daemon=True)
+            pruner.start()
+            _job_pruner.append(pruner)
+
+def prune_jobs():
+    """Delete finished jobs past JOB_RETENTION, their events, and logs nothing points to any more"""
+    cutoff = (datetime.now() - JOB_RETENTION).isoformat()
+    expired = "SELECT id FROM jobs WHERE status IN ('done', 'failed') AND updated < ?"
+    with transaction() as db:
+        db.execute(f'DELETE FROM job_events WHERE job_id IN ({expired})', (cutoff,))
+        db.execute(f'DELETE FROM jobs WHERE id IN ({expired})', (cutoff,))
+        # Logs of runs that neither a player nor a remaining job points to
+        db.execute('DELETE FROM submission_logs WHERE created < ? '
+                   'AND NOT EXISTS (SELECT 1 FROM players WHERE players.logs_id = submission_logs.id) '
+                   'AND NOT EXISTS (SELECT 1 FROM jobs WHERE jobs.id = submission_logs.job_id)',
+                   (cutoff,))
+
+def touch_queued_jobs():
+    """Bump the updated timestamp of jobs waiting in this process's queue
+
+    Nothing else touches a job until a worker takes it, and a full queue
+    can wait longer than JOB_STALE_AFTER. Jobs whose process is gone stop
+    being touched, so they are still failed as stale.
+    """
+    with _job_queue.mutex:
+        waiting = list(_job_queue.queue)
+    if not waiting:
+        return
+    marks = ', '.join('?' * len(waiting))
+    with transaction() as db:
+        db.execute(f"UPDATE jobs SET updated = ? WHERE status = 'queued' "
+                   f"AND (id IN ({marks}) OR attached_to IN ({marks}))",
+                   (datetime.now().isoformat(), *waiting, *waiting))
+
+def job_pruner():
+    """Background loop pruning old jobs and keeping queued ones fresh, off the submission path"""
+    while True:
+        try:
+            touch_queued_jobs()
+            prune_jobs()
+        except sqlite3.Error:
+            app.logger.exception('Could not prune old jobs')
+        time.sleep(JOB_PRUNE_INTERVAL)
+
+def normalize_api_url(api_url):
+    """Canonical form of an API URL, used to spot submissions of the same API"""
+    parts = urlparse(api_url.strip())
+    path = parts.path.rstrip('/') + '/'
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}{path}"
+
+def submit_job(user_name, api_url, api_name, options=None):
+    """Queue a test run; returns (job_id, error_message, http_status)
+
+    A submission for an API that is already being tested with the same
+    options attaches to that run instead of testing it again. A seed in
+    the options replays the cases of the run it came from; otherwise a
+    fresh one is drawn.
+    """
+    start_job_workers()
+    now = datetime.now()
+    user_key = user_name.lower().strip()
+    url_key = normalize_api_url(api_url)
+    options_json = json.dumps(options or {}, sort_keys=True)
+
+    with _job_submit_lock:
+        with transaction() as db:
+            in_flight = db.execute(
+                "SELECT * FROM jobs WHERE url_key = ? AND options = ? AND attached_to IS NULL "
+                "AND status IN ('queued', 'running') AND updated > ? ORDER BY created LIMIT 1",
+                (url_key, options_json, (now - JOB_STALE_AFTER).isoformat())).fetchone()
+            if in_flight is not None:
+                if in_flight['user_key'] == user_key:
+                    # The same user resubmitted while their run is still going
+                    return in_flight['id'], None, 202
+                following = db.execute(
+                    "SELECT id FROM jobs WHERE attached_to = ? AND user_key = ? AND status IN ('queued', 'running')",
+                    (in_flight['id'], user_key)).fetchone()
+                if following is not None:
+                    # ...or while they are already following someone else's run of it
+                    return following['id'], None, 202
+
+            active = db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE user_key = ? AND status IN ('queued', 'running') AND updated > ?",
+                (user_key, (now - JOB_STALE_AFTER).isoformat())).fetchone()[0]
+            if active >= MAX_JOBS_PER_USER:
+                return None, f'You already have {active} tests queued or running. Please wait for them to finish.', 429
+
+            job_id = uuid.uuid4().hex
+            seed = (options or {}).get('seed')
+            if seed is None:
+                seed = random.randrange(MAX_SEED)
+            if in_flight is not None:
+                # Follow the in-flight run, starting with everything it has reported so far
+                db.execute(
+                    'INSERT INTO jobs (id, user_key, user_name, api_name, api_url, url_key, status, rounds_total, '
+                    'progress, options, attached_to, seed, created, updated) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (job_id, user_key, user_name, api_name, api_url, url_key, in_flight['status'],
+                     in_flight['rounds_total'], in_flight['progress'], options_json, in_flight['id'],
+                     in_flight['seed'], now.isoformat(), now.isoformat()))
+                db.execute('INSERT INTO job_events (job_id, event, data) '
+                           'SELECT ?, event, data FROM job_events WHERE job_id = ? ORDER BY seq',
+                           (job_id, in_flight['id']))
+                return job_id, None, 202
+
+            if _job_queue.full():
+                return None, 'The tester is busy right now. Please try again in a few minutes.', 503
+
+            db.execute(
+                'INSERT INTO jobs (id, user_key, user_name, api_name, api_url, url_key, status, rounds_total, '
+                'options, seed, created, updated) '
+                "VALUES (?, ?, ?, ?, ?, ?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, user_key, user_name, api_name, api_url, url_key, rounds_for_seed(seed),
+                 options_json, seed, now.isoformat(), now.isoformat()))
+        # Only consumers touch the queue outside this lock, so it cannot have filled up
+        _job_queue.put_nowait(job_id)
+
+    return job_id, None, 202
+
+def run_job(job_id):
+    """Run a queued test job and record its results on the leaderboard
+
+    Jobs attached to this one while it runs share its events and results.
+    """
+    row = get_db().execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+    if row is None or row['status'] != 'queued':
+        # Gone, or given up on as stale while it waited in the queue
+        return
+    update_job(job_id, followers=True, status='running')
+
+    progress = []
+    def record_event(event, data):
+        add_job_event(job_id, event, data, followers=True)
+        if event == 'round':
+            progress.append(data)
+            update_job(job_id, followers=True, progress=json.dumps(progress))
+
+    num_test_rounds = row['rounds_total']
+    total_score, detailed_results, test_logs = test_endpoint(row['api_url'], num_test_rounds,
+                                                             on_event=record_event, seed=row['seed'])
+    results = summarize_results(total_score, detailed_results, num_test_rounds)
+    if row['seed'] is not None:
+        results['seed'] = row['seed']
+        results['corpus_version'] = CORPUS_VERSION
+
+    options = json.loads(row['options'] or '{}')
+    if options.get('load_test'):
+        load_test = options['load_test']
+        results['load_test'] = run_load_test(row['api_url'], load_test['concurrency'], load_test['rate'], load_test['duration'])
+
+    with measuring('tester_save_leaderboard_seconds'), transaction() as db:
+        # One copy of the logs serves this job and everyone following it
+        logs_id = store_test_logs(db, test_logs, job_id)
+        followers = db.execute("SELECT * FROM jobs WHERE attached_to = ? AND status IN ('queued', 'running')",
+                               (job_id,)).fetchall()
+        for job in [row] + followers:
+            # Update or add to leaderboard
+            score_updated, update_type = update_or_add_player(db, job['user_name'], job['api_name'], results,
+                                                              test_logs, logs_id=logs_id, api_url=job['api_url'])
+            result = {
+                'results': results,
+                'logs_id': logs_id,
+                'update_type': update_type,
+                'score_updated': score_updated
+            }
+            update_job(job['id'], status='done', result=json.dumps(result))
+            add_job_event(job['id'], 'done', {'results': results, 'update_type': update_type})
+
+def job_worker():
+    """Worker thread loop taking jobs off the queue"""
+    while True:
+        job_id = _job_queue.get()
+        try:
+            run_job(job_id)
+        except Exception as e:
+            app.logger.exception('Job %s failed', job_id)
+            with transaction():
+                update_job(job_id, followers=True, status='failed', error=str(e))
+                add_job_event(job_id, 'failed', {'error': str(e)}, followers=True)
+        finally:
+            _job_queue.task_done()
+
+def job_test_logs(job):
+    """A finished job's test logs, decoded on demand"""
+    if 'logs_id' in job:
+        return fetch_test_logs(job['logs_id'])
+    # Finished before logs were stored separately
+    return job.get('test_logs', [])
+
+def submission_error(user_name, api_url):
+    """Why a test submission is invalid, or None if it is fine"""
+    if not user_name or not api_url:
+        return 'Please provide both your name and API URL'
+    if not api_url.startswith(('http://', 'https://')):
+        return 'Invalid URL format. Please include http:// or https://'
+    return None
+
+def seed_error(seed):
+    """Why a seed string cannot be used, or None if it is empty or valid"""
+    if seed and not (seed.isdigit() and int(seed) < MAX_SEED):
+        return f'The seed must be a whole number below {MAX_SEED}'
+    return None
+
+def json_body_error(body, text_fields=()):
+    """Why a JSON request body cannot be used, or None if it is an object with text where text is expected"""
+    if not isinstance(body, dict):
+        return 'The request body must be a JSON object'
+    for name in text_fields:
+        if body.get(name) is not None and not isinstance(body[name], str):
+            return f'{name} must be a string'
+    return None
+
+def bulk_entries(entries):
+    """Validate bulk test entries; returns (entries, error_message)"""
+    if not isinstance(entries, list) or not entries:
+        return None, 'Provide a non-empty list of entries'
+    if len(entries) > BULK_TEST_MAX_ENTRIES:
+        return None, f'At most {BULK_TEST_MAX_ENTRIES} entries can be tested at once'
+    cleaned = []
+    seen = set()
+    for i, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict):
+            return None, f'Entry {i}: expected an object with user_name and api_url'
+        user_name = str(entry.get('user_name') or '').strip()
+        api_url = str(entry.get('api_url') or '').strip()
+        error = submission_error(user_name, api_url)
+        if error:
+            return None, f'Entry {i}: {error}'
+        if user_name.lower() in seen:
+            return None, f'Entry {i}: {user_name} is listed more than once'
+        seen.add(user_name.lower())
+        cleaned.append({'user_name': user_name, 'api_url': api_url,
+                        'api_name': str(entry.get('api_name') or 'User API').strip()})
+    return cleaned, None
+
+def leaderboard_bulk_entries():
+    """Bulk test entries for every player whose API URL is known"""
+    rows = get_db().execute('SELECT user, api_name, api_url FROM players WHERE api_url IS NOT NULL '
+                            'ORDER BY total_score DESC, rowid')
+    return [{'user_name': row['user'], 'api_url': row['api_url'], 'api_name': row['api_name']} for row in rows]
+
+def run_bulk_test(entries, seed=None, concurrency=BULK_TEST_CONCURRENCY, replace=False, on_progress=None):
+    """Test many APIs concurrently, then apply every result in one write
+
+    All entries get the same seed, so they answer the same test cases, and
+    entries sharing an API URL are tested once. The per-host limit in
+    run_probe() still applies across the whole batch. If given,
+    on_progress(report, finished) is called as each API finishes, with the
+    report rows it completed.
+    """
+    if seed is None:
+        seed = random.randrange(MAX_SEED)
+    num_test_rounds = rounds_for_seed(seed)
+    report = {
+        'seed': seed,
+        'rounds': num_test_rounds,
+        'total': len(entries),
+        'completed': 0,
+        'failed': 0,
+        'entries': [{'user': entry['user_name'], 'api_url': entry['api_url'], 'status': 'queued'}
+                    for entry in entries]
+    }
+    by_url = {}
+    for i, entry in enumerate(entries):
+        by_url.setdefault(normalize_api_url(entry['api_url']), []).append(i)
+    outcomes = {}
+    lock = threading.Lock()
+
+    def test_url(url_key, indexes):
+        try:
+            total_score, detailed_results, test_logs = test_endpoint(entries[indexes[0]]['api_url'],
+                                                                     num_test_rounds, seed=seed)
+            results = summarize_results(total_score, detailed_results, num_test_rounds)
+            results.update(seed=seed, corpus_version=CORPUS_VERSION)
+            error = None
+        except Exception as e:
+            app.logger.exception('Bulk test of %s failed', url_key)
+            results, test_logs, error = None, None, str(e)
+        with lock:
+            outcomes[url_key] = (results, test_logs)
+            finished = [report['entries'][i] for i in indexes]
+            for row in finished:
+                if error:
+                    row.update(status='failed', error=error)
+                    report['failed'] += 1
+                else:
+                    row.update(status='tested', total_score=results['total_score'], accuracy=results['accuracy'])
+            report['completed'] += len(finished)
+            if on_progress:
+                on_progress(report, finished)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for url_key, indexes in by_url.items():
+            executor.submit(test_url, url_key, indexes)
+
+    with measuring('tester_save_leaderboard_seconds'), transaction() as db:
+        for url_key, indexes in by_url.items():
+            results, test_logs = outcomes[url_key]
+            if results is None:
+                continue
+            logs_id = store_test_logs(db, test_logs)
+            for i in indexes:
+                entry = entries[i]
+                _, update_type = update_or_add_player(db, entry['user_name'], entry['api_name'], results, test_logs,
+                                                      logs_id=logs_id, api_url=entry['api_url'], replace=replace)
+                report['entries'][i]['update_type'] = update_type
+    return report
+
+def start_bulk_job(entries, seed=None, replace=False):
+    """Run a bulk test in a background thread; returns (bulk_id, error_message, http_status)"""
+    now = datetime.now()
+    with _job_submit_lock:
+        with transaction() as db:
+            running = db.execute("SELECT id FROM bulk_jobs WHERE status = 'running' AND updated > ?",
+                                 ((now - JOB_STALE_AFTER).isoformat(),)).fetchone()
+            if running is not None:
+                return None, f"Bulk test {running['id']} is still running", 409
+            bulk_id = uuid.uuid4().hex
+            report = {'total': len(entries), 'completed': 0, 'failed': 0, 'entries': []}
+            db.execute("INSERT INTO bulk_jobs (id, status, report, created, updated) VALUES (?, 'running', ?, ?, ?)",
+                       (bulk_id, json.dumps(report), now.isoformat(), now.isoformat()))
+    threading.Thread(target=run_bulk_job, args=(bulk_id, entries, seed, replace),
+                     name=f'bulk-test-{bulk_id[:8]}', daemon=True).start()
+    return bulk_id, None, 202
+
+def run_bulk_job(bulk_id, entries, seed, replace):
+    """Thread body for start_bulk_job(), recording progress as it goes"""
+    def save_progress(report, finished):
+        get_db().execute('UPDATE bulk_jobs SET report = ?, updated = ? WHERE id = ?',
+                         (json.dumps(report), datetime.now().isoformat(), bulk_id))
+
+    try:
+        report = run_bulk_test(entries, seed, replace=replace, on_progress=save_progress)
+        get_db().execute("UPDATE bulk_jobs SET status = 'done', report = ?, updated = ? WHERE id = ?",
+                         (json.dumps(report), datetime.now().isoformat(), bulk_id))
+    except Exception as e:
+        app.logger.exception('Bulk test %s failed', bulk_id)
+        get_db().execute("UPDATE bulk_jobs SET status = 'failed', error = ?, updated = ? WHERE id = ?",
+                         (str(e), datetime.now().isoformat(), bulk_id))
+
+def bulk_test_authorized():
+    """Whether the request carries the bulk test token"""
+    # Compared as bytes: compare_digest refuses str with non-ASCII characters
+    return hmac.compare_digest(request.headers.get('Authorization', '').encode(),
+                               f'Bearer {BULK_TEST_TOKEN}'.encode())
+
+def wants_json():
+    """Whether the client asked for a JSON response instead of HTML"""
+    return request.is_json or request.accept_mimetypes.best == 'application/json'
+
+def rechunk(pieces, size):
+    """Join a template's many small output pieces into chunks of about size characters"""
+    buffer, length = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+def stream_page(template_name, **context):
+    """Stream a rendered template instead of building the whole page in memory"""
+    # Flashed messages are stored in the session, which is saved before a
+    # streamed body is generated, so take them off the session up front.
+    # The template still reads them from the request context.
+    get_flashed_messages(with_categories=True)
+    return app.response_class(rechunk(stream_template(template_name, **context), STREAM_CHUNK_SIZE))
+
+def compress_body(body, encoding):
+    """Compress a whole response body with the negotiated encoding"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return zlib.compress(body, GZIP_LEVEL, wbits=31)
+
+def compress_stream(chunks, encoding):
+    """Compress a streamed body chunk by chunk, flushing so each one reaches the client"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        compress, flush, finish = compressor.compress, partial(compressor.flush, zlib.Z_SYNC_FLUSH), compressor.flush
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        if chunk:
+            yield compress(chunk) + flush()
+    yield finish()
+
+@app.after_request
+def compress_response(response):
+    """Compress pages and API responses for clients that accept gzip or brotli"""
+    if (response.mimetype not in COMPRESS_MIMETYPES or response.status_code != 200
+            or response.direct_passthrough or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(['br', 'gzip'] if brotli else ['gzip'])
+    if encoding is None:
+        return response
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < COMPRESS_MIN_SIZE:
+            return response
+        response.set_data(compress_body(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    record_metric('tester_compressed_responses_total', 1, encoding=encoding)
+    return response
+
+@app.route('/test', methods=['POST'])
+def test_api():
+    body = request.get_json(silent=True)
+    if body is not None:
+        error = json_body_error(body, ('user_name', 'api_url', 'api_name'))
+        if error:
+            return jsonify({'error': error}), 400
+    form = body or request.form
+    user_name = (form.get('user_name') or '').strip()
+    api_url = (form.get('api_url') or '').strip()
+    api_name = (form.get('api_name') or 'User API').strip()
+    seed = form.get('seed')
+    seed = '' if seed is None else str(seed).strip()
+
+    error = submission_error(user_name, api_url) or seed_error(seed)
+    if not error and form.get('load_test') and not LOAD_TEST_ENABLED:
+        error = 'Load testing is not enabled on this server'
+
+    if error:
+        if wants_json():
+            return jsonify({'error': error}), 400
+        flash(error, 'error')
+        return redirect(url_for('index'))
+
+    options = {}
+    load_test = load_test_options(form)
+    if load_test:
+        options['load_test'] = load_test
+    if seed:
+        options['seed'] = int(seed)
+
+    # Queue the test; a worker thread runs it in the background
+    job_id, error, status = submit_job(user_name, api_url, api_name, options)
+    if error:
+        if wants_json():
+            return jsonify({'error': error}), status
+        flash(error, 'error')
+        return redirect(url_for('index'))
+
+    if wants_json():
+        return jsonify({'job_id': job_id, 'status_url': url_for('api_job', job_id=job_id)}), 202
+    return redirect(url_for('job_status', job_id=job_id))
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = get_job(job_id)
+    if job is None:
+        flash('That test could not be found. It may have expired.', 'error')
+        return redirect(url_for('index'))
+
+    if job['status'] == 'failed':
+        flash(f'Testing failed: {job.get("error", "unknown error")}', 'error')
+        return redirect(url_for('index'))
+
+    if job['status'] != 'done':
+        return render_template('job.html', job=job)
+
+    user_name = job['user']
+    total_score = job['results']['total_score']
+    update_type = job['update_type']
 
     # Set appropriate flash message
     if update_type == "improved":
@@ -427,27 +2398,279 @@ def test_api():
     elif update_type == "new_player":
         flash(f'Welcome to the leaderboard {user_name}!', 'success')
 
-    return render_template('results.html', 
-                         user_name=user_name,
-                         api_name=api_name,
-                         results=results,
-                         test_logs=test_logs,
-                         update_type=update_type,
-                         score_updated=score_updated)
+    # Results pages can hold thousands of log rows, so they are streamed
+    return stream_page('results.html',
+                       user_name=user_name,
+                       api_name=job['api_name'],
+                       results=job['results'],
+                       test_logs=job_test_logs(job),
+                       update_type=update_type,
+                       score_updated=job['score_updated'],
+                       rank=player_rank(user_name),
+                       history=load_history(user_name, 14))
+
+def page_args(default_limit):
+    """Read ?offset=&limit= pagination arguments, clamped to sane values"""
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = request.args.get('limit', default_limit, type=int)
+    if limit is not None:
+        limit = min(max(limit, 1), LEADERBOARD_MAX_LIMIT)
+    return offset, limit
+
+def leaderboard_not_modified(state):
+    """Whether the client's cached copy of this leaderboard version is current"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(f"lb-{state['version']}")
+    return bool(request.if_modified_since) and state['modified'] <= request.if_modified_since
+
+def add_leaderboard_cache_headers(response, state, public):
+    """Let clients and proxies revalidate leaderboard responses by version"""
+    response.set_etag(f"lb-{state['version']}", weak=True)
+    response.last_modified = state['modified']
+    response.cache_control.no_cache = True
+    if public:
+        response.cache_control.public = True
+    else:
+        response.cache_control.private = True
+    return response
+
+def leaderboard_table(state, offset, limit):
+    """The rendered table for one leaderboard page, or None if the page is empty
+
+    Fragments are cached per leaderboard version, so repeat views of an
+    unchanged leaderboard skip ranking and rendering the rows.
+    """
+    key = (state['version'], offset, limit)
+    with _leaderboard_fragments_lock:
+        if key in _leaderboard_fragments:
+            _leaderboard_fragments.move_to_end(key)
+            record_metric('tester_leaderboard_fragment_hits_total', 1)
+            return _leaderboard_fragments[key]
+
+    index = get_score_index()
+    page = [dict(entry, rank=index.rank(entry['results']['total_score']))
+            for entry in load_leaderboard_page(offset, limit)]
+    table = None
+    if page:
+        table = Markup(render_template('_leaderboard_table.html',
+                                       leaderboard=page,
+                                       offset=offset,
+                                       limit=limit,
+                                       total=index.players))
+
+    with _leaderboard_fragments_lock:
+        for stale in [cached for cached in _leaderboard_fragments if cached[0] < key[0]]:
+            del _leaderboard_fragments[stale]
+        _leaderboard_fragments[key] = table
+        while len(_leaderboard_fragments) > LEADERBOARD_FRAGMENT_CACHE_SIZE:
+            _leaderboard_fragments.popitem(last=False)
+    return table
 
 @app.route('/leaderboard')
+@measured('tester_leaderboard_render_seconds')
 def leaderboard():
-    leaderboard_data = load_leaderboard()
-    # Sort by total score descending
-    leaderboard_data.sort(key=lambda x: x['results']['total_score'], reverse=True)
-    return render_template('leaderboard.html', leaderboard=leaderboard_data)
+    # Sorted by total score descending
+    state = get_leaderboard_state()
+    if leaderboard_not_modified(state):
+        return add_leaderboard_cache_headers(app.response_class(status=304), state, public=False)
+
+    offset, limit = page_args(LEADERBOARD_PAGE_SIZE)
+    table = leaderboard_table(state, offset, limit)
+    response = app.make_response(render_template('leaderboard.html', table=table, offset=offset, limit=limit))
+    return add_leaderboard_cache_headers(response, state, public=False)
 
 @app.route('/api/leaderboard')
 def api_leaderboard():
-    """API endpoint to get leaderboard data"""
-    leaderboard_data = load_leaderboard()
-    leaderboard_data.sort(key=lambda x: x['results']['total_score'], reverse=True)
-    return jsonify(leaderboard_data)
+    """API endpoint to get leaderboard data
+
+    Supports ?offset=&limit= paging; pass ?logs=1 to include test logs.
+    """
+    state = get_leaderboard_state()
+    if leaderboard_not_modified(state):
+        return add_leaderboard_cache_headers(app.response_class(status=304), state, public=True)
+
+    offset, limit = page_args(None)
+    index = get_score_index()
+    page = [dict(entry, rank=index.rank(entry['results']['total_score']))
+            for entry in load_leaderboard_page(offset, limit)]
+    if request.args.get('logs', type=int):
+        logs = load_test_logs(entry['user'] for entry in page)
+        page = [dict(entry, test_logs=logs.get(entry['user'], [])) for entry in page]
+
+    response = jsonify(page)
+    response.headers['X-Total-Count'] = str(index.players)
+    return add_leaderboard_cache_headers(response, state, public=True)
+
+@app.route('/api/rank/<user_name>')
+def api_rank(user_name):
+    """API endpoint giving a player's current rank on the leaderboard"""
+    player = find_existing_player(get_db(), user_name)
+    if player is None:
+        return jsonify({'error': 'Player not found'}), 404
+    index = get_score_index()
+    return jsonify({
+        'user': player['user'],
+        'api_name': player['api_name'],
+        'total_score': player['total_score'],
+        'rank': index.rank(player['total_score']),
+        'players': index.players
+    })
+
+@app.route('/api/history/<user_name>')
+def api_history(user_name):
+    """API endpoint giving a player's daily score, accuracy and p95 latency trend
+
+    ?days= sets how far back to go (default 30).
+    """
+    days = min(max(request.args.get('days', 30, type=int), 1), HISTORY_MAX_DAYS)
+    history = load_history(user_name, days)
+    if not history and find_existing_player(get_db(), user_name) is None:
+        return jsonify({'error': 'Player not found'}), 404
+    return jsonify(history)
+
+@app.route('/api/jobs/<job_id>')
+def api_job(job_id):
+    """API endpoint reporting a test job's progress and final results
+
+    Pass ?logs=1 to include a finished job's test logs.
+    """
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['status'] == 'done' and request.args.get('logs', type=int):
+        job['test_logs'] = job_test_logs(job)
+    return jsonify(job)
+
+@app.route('/api/jobs/<job_id>/events')
+def api_job_events(job_id):
+    """Server-Sent Events stream of a job's log entries and round scores"""
+    if get_job(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if not _job_event_streams.acquire(blocking=False):
+        response = jsonify({'error': 'Too many open event streams; poll this job instead',
+                            'status_url': url_for('api_job', job_id=job_id)})
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+    after = request.headers.get('Last-Event-ID', 0, type=int)
+    response = app.response_class(stream_job_events(job_id, after), mimetype='text/event-stream')
+    response.call_on_close(_job_event_streams.release)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics added up over every worker process"""
+    totals = collect_metrics()
+    size = 0
+    for path in (DATABASE_FILE, DATABASE_FILE + '-wal'):
+        if os.path.exists(path):
+            size += os.path.getsize(path)
+    totals[('tester_leaderboard_file_bytes', ())] = size
+    return app.response_class(render_metrics(totals), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/bulk-test', methods=['POST'])
+def api_bulk_test():
+    """Test a list of APIs, or every API on the leaderboard, in one batch
+
+    Takes {"entries": [{"user_name", "api_url", "api_name"}, ...]} or
+    {"from_leaderboard": true}, plus optional "seed" and "replace" (keep
+    the new scores even when lower). Needs the BULK_TEST_TOKEN bearer token.
+    """
+    if not BULK_TEST_TOKEN:
+        return jsonify({'error': 'Bulk testing is not enabled on this server'}), 403
+    if not bulk_test_authorized():
+        return jsonify({'error': 'Missing or invalid bulk test token'}), 401
+
+    body = request.get_json(silent=True)
+    error = json_body_error(body)
+    if error:
+        return jsonify({'error': error}), 400
+    seed = body.get('seed')
+    seed = '' if seed is None else str(seed).strip()
+    error = seed_error(seed)
+    if error:
+        return jsonify({'error': error}), 400
+    if body.get('from_leaderboard'):
+        entries, error = bulk_entries(leaderboard_bulk_entries())
+    else:
+        entries, error = bulk_entries(body.get('entries'))
+    if error:
+        return jsonify({'error': error}), 400
+
+    bulk_id, error, status = start_bulk_job(entries, int(seed) if seed else None, bool(body.get('replace')))
+    if error:
+        return jsonify({'error': error}), status
+    return jsonify({'bulk_id': bulk_id, 'status_url': url_for('api_bulk_test_status', bulk_id=bulk_id)}), 202
+
+@app.route('/api/bulk-test/<bulk_id>')
+def api_bulk_test_status(bulk_id):
+    """API endpoint reporting a bulk test's progress and per-entry results"""
+    if not BULK_TEST_TOKEN:
+        return jsonify({'error': 'Bulk testing is not enabled on this server'}), 403
+    if not bulk_test_authorized():
+        return jsonify({'error': 'Missing or invalid bulk test token'}), 401
+    row = get_db().execute('SELECT * FROM bulk_jobs WHERE id = ?', (bulk_id,)).fetchone()
+    if row is None:
+        return jsonify({'error': 'Bulk test not found'}), 404
+    bulk = {'id': row['id'], 'status': row['status'], 'created': row['created'], 'updated': row['updated']}
+    bulk.update(json.loads(row['report']))
+    if row['error']:
+        bulk['error'] = row['error']
+    return jsonify(bulk)
+
+@app.route('/api/session-pool')
+def api_session_pool():
+    """API endpoint reporting keep-alive connection reuse
+
+    Hosts are the APIs participants submitted, so the per-host breakdown
+    needs the BULK_TEST_TOKEN bearer token; anyone else gets the totals.
+    """
+    stats = session_pool_stats()
+    if BULK_TEST_TOKEN and bulk_test_authorized():
+        return jsonify(stats)
+    return jsonify({
+        'hosts': len(stats),
+        'active': sum(1 for host_stats in stats.values() if host_stats['active']),
+        'opened': sum(host_stats['opened'] for host_stats in stats.values()),
+        'reused': sum(host_stats['reused'] for host_stats in stats.values())
+    })
+
+@app.cli.command('bulk-test')
+@click.argument('entries_file', type=click.File('r'), required=False)
+@click.option('--from-leaderboard', is_flag=True, help='Re-test every API on the leaderboard.')
+@click.option('--seed', type=click.IntRange(0, MAX_SEED - 1), help='Seed choosing the test cases.')
+@click.option('--concurrency', type=click.IntRange(1), default=BULK_TEST_CONCURRENCY, show_default=True,
+              help='APIs tested at once.')
+@click.option('--replace', is_flag=True, help='Keep the new scores even when they are lower.')
+def bulk_test_command(entries_file, from_leaderboard, seed, concurrency, replace):
+    """Test many APIs at once and update the leaderboard.
+
+    ENTRIES_FILE is a JSON list of {"user_name", "api_url", "api_name"}
+    objects ("-" reads standard input).
+    """
+    if from_leaderboard == bool(entries_file):
+        raise click.UsageError('Give either ENTRIES_FILE or --from-leaderboard')
+    entries, error = bulk_entries(leaderboard_bulk_entries() if from_leaderboard else json.load(entries_file))
+    if error:
+        raise click.ClickException(error)
+
+    def show_progress(report, finished):
+        for row in finished:
+            outcome = row.get('error') if row['status'] == 'failed' else f"{row['total_score']} points"
+            click.echo(f"[{report['completed']}/{report['total']}] {row['user']}: {outcome}")
+
+    started = time.perf_counter()
+    report = run_bulk_test(entries, seed, concurrency, replace, on_progress=show_progress)
+    click.echo(f"Tested {report['total']} entries in {time.perf_counter() - started:.1f}s "
+               f"(seed {report['seed']}, {report['rounds']} rounds, {report['failed']} failed)")
+
+@app.cli.command('rebuild-history')
+def rebuild_history_command():
+    """Recompute the submission history rollups from the daily history files."""
+    runs = rebuild_history_rollups()
+    click.echo(f'Rebuilt history rollups from {runs} runs in {HISTORY_DIR}')
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
@@ -0,0 +1,384 @@
+"""Benchmark the tester itself against a local mock sentiment API.
+
+Starts a stand-in for a participant API (analyze-mood, detect-crisis and
+summarize) with configurable latency, error and timeout profiles, then
+measures test_endpoint(), the /test job path, the leaderboard pages and
+the leaderboard persistence functions as the leaderboard grows.
+
+    python benchmark.py                      # full run, 10 to 100k players
+    python benchmark.py --quick              # smaller sizes and fewer runs
+    python benchmark.py --output bench.json  # where to store the results
+
+Everything runs against a throwaway database in a temporary directory.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Point the app at a scratch database before it is imported
+WORK_DIR = tempfile.mkdtemp(prefix='sentiment-bench-')
+os.environ['DATABASE_FILE'] = os.path.join(WORK_DIR, 'bench.db')
+
+import app  # noqa: E402
+
+# Timeouts used while benchmarking, so the timeout profile finishes quickly
+BENCH_TIMEOUT = 1.0
+
+# How long to wait for submitted jobs before reporting them as unfinished
+SUBMISSION_TIMEOUT = 300
+
+# name: (base latency s, jitter s, error rate, timeout rate)
+PROFILES = {
+    'fast': (0.005, 0.005, 0.0, 0.0),
+    'typical': (0.15, 0.1, 0.0, 0.0),
+    'slow': (1.2, 0.6, 0.0, 0.0),
+    'flaky': (0.05, 0.05, 0.1, 0.05),
+}
+
+MOOD_WORDS = {
+    'happy': ('amazing', 'excited', 'thrilled', 'best', 'joyful', 'wonderful'),
+    'sad': ('down', 'unhappy', 'crying', 'depressing', 'disappointed'),
+    'angry': ('infuriating', 'mad', 'disrespected', 'frustrating', 'always happen'),
+}
+CRISIS_WORDS = ('hopeless', 'hurt myself', 'continue living', 'better off without me', 'ending it', 'want to die')
+
+def make_mock_handler(profile):
+    """Build a request handler class answering like a decent participant API"""
+    base_latency, jitter, error_rate, timeout_rate = PROFILES[profile]
+
+    class MockSentimentHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Buffer writes so headers and body leave in one segment, as real
+        # servers do; unbuffered writes trip Nagle/delayed-ACK stalls
+        wbufsize = 64 * 1024
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            text = json.loads(self.rfile.read(length) or b'{}').get('text', '')
+
+            roll = random.random()
+            if roll < timeout_rate:
+                time.sleep(BENCH_TIMEOUT + 0.5)
+            else:
+                time.sleep(base_latency + random.random() * jitter)
+            if roll > 1 - error_rate:
+                return self.respond(500, {'error': 'mock failure'})
+
+            endpoint = self.path.rstrip('/').rsplit('/', 1)[-1]
+            lowered = text.lower()
+            if endpoint == 'analyze-mood':
+                emotion = next((mood for mood, words in MOOD_WORDS.items()
+                                if any(word in lowered for word in words)), 'neutral')
+                self.respond(200, {'emotion': emotion})
+            elif endpoint == 'detect-crisis':
+                self.respond(200, {'crisis_detected': any(word in lowered for word in CRISIS_WORDS)})
+            elif endpoint == 'summarize':
+                self.respond(200, {'summary': text.split('. ')[0][:120]})
+            else:
+                self.respond(404, {'error': 'unknown endpoint'})
+
+        def respond(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # The tester gave up waiting (timeout profile)
+                pass
+
+    return MockSentimentHandler
+
+def start_mock_api(profile):
+    """Serve the mock API on a free local port; returns (server, base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_mock_handler(profile))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}/'
+
+def summarize_timings(samples):
+    """Percentile summary of a list of durations in seconds, reported in ms"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 2),
+        'p50_ms': round(app.percentile(ordered, 50) * 1000, 2),
+        'p90_ms': round(app.percentile(ordered, 90) * 1000, 2),
+        'p99_ms': round(app.percentile(ordered, 99) * 1000, 2),
+        'max_ms': round(ordered[-1] * 1000, 2),
+    }
+
+def timed(func, *args, **kwargs):
+    """Call func and return (result, seconds elapsed)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def peak_memory(func, *args, **kwargs):
+    """Call func with allocation tracing on and return (result, peak traced bytes)
+
+    Tracing slows Python down several times over, so this is a separate
+    pass from the timed calls.
+    """
+    tracemalloc.start()
+    try:
+        result = func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+def recording_latencies(run_probe, latencies):
+    """Wrap app.run_probe to collect each answered probe's unrounded latency
+
+    The logs only keep latencies rounded to 10 ms, too coarse for fast targets.
+    """
+    def wrapper(*args, **kwargs):
+        log_entry, outcome = run_probe(*args, **kwargs)
+        if 'latency' in log_entry:
+            latencies.append(outcome['latency'])
+        return log_entry, outcome
+    return wrapper
+
+def bench_test_endpoint(profile, runs, rounds):
+    """Time full test_endpoint() runs and the probes inside them"""
+    server, base_url = start_mock_api(profile)
+    run_probe = app.run_probe
+    try:
+        durations = []
+        probe_latencies = []
+        app.run_probe = recording_latencies(run_probe, probe_latencies)
+        for _ in range(runs):
+            _, elapsed = timed(app.test_endpoint, base_url, rounds)
+            durations.append(elapsed)
+        app.run_probe = run_probe
+        _, peak = peak_memory(app.test_endpoint, base_url, rounds)
+        return {
+            'profile': profile,
+            'runs': runs,
+            'rounds': rounds,
+            'runs_per_second': round(runs / sum(durations), 3),
+            'run_duration': summarize_timings(durations),
+            'probe_latency': summarize_timings(probe_latencies),
+            'probes_answered': len(probe_latencies),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+    finally:
+        app.run_probe = run_probe
+        server.shutdown()
+
+def bench_submissions(profile, submissions):
+    """Time /test from submission to finished job through the job queue"""
+    server, base_url = start_mock_api(profile)
+    client = app.app.test_client()
+    try:
+        accept_times = []
+        job_ids = []
+        start = time.perf_counter()
+        for i in range(submissions):
+            submit_start = time.perf_counter()
+            response = client.post('/test', json={
+                'user_name': f'bench-{profile}-{i}',
+                # A distinct path per run keeps submissions from being deduplicated
+                'api_url': f'{base_url}run-{i}/',
+                'api_name': 'Benchmark API'
+            })
+            accept_times.append(time.perf_counter() - submit_start)
+            if response.status_code == 202:
+                job_ids.append(response.get_json()['job_id'])
+
+        pending = set(job_ids)
+        deadline = time.perf_counter() + SUBMISSION_TIMEOUT
+        while pending and time.perf_counter() < deadline:
+            for job_id in list(pending):
+                if app.get_job(job_id)['status'] in ('done', 'failed'):
+                    pending.discard(job_id)
+            time.sleep(0.05)
+        total = time.perf_counter() - start
+        finished = len(job_ids) - len(pending)
+
+        return {
+            'profile': profile,
+            'submitted': submissions,
+            'accepted': len(job_ids),
+            'unfinished': len(pending),
+            'accept_latency': summarize_timings(accept_times),
+            'jobs_per_second': round(finished / total, 3) if total else 0,
+            'total_seconds': round(total, 2),
+        }
+    finally:
+        server.shutdown()
+
+def synthetic_entry(i):
+    """A leaderboard entry shaped like a real submission with one round of logs"""
+    score = random.randint(0, 300)
+    timestamp = datetime.now().isoformat()
+    logs = [{
+        'endpoint': 'analyze-mood',
+        'test_num': n,
+        'text': 'I feel amazing today!',
+        'expected': 'happy',
+        'latency': round(random.random(), 2),
+        'predicted': 'happy',
+        'status': 'CORRECT',
+        'speed_bonus': 'FAST'
+    } for n in range(1, 9)]
+    return {
+        'user': f'player-{i}',
+        'api_name': 'Synthetic API',
+        'results': {
+            'total_score': score,
+            'rounds_tested': 1,
+            'avg_score': score,
+            'accuracy': round(random.random() * 100, 1),
+            'total_correct': 8,
+            'total_tests': 8,
+            'fast_responses': 8,
+            'rating': '🥈 GOOD',
+            'timestamp': timestamp
+        },
+        'test_logs': [{'round': 1, 'logs': logs, 'score': score}],
+        'submission_count': 1,
+        'last_updated': timestamp,
+        'first_submission': timestamp
+    }
+
+def database_bytes():
+    """Size of the database on disk, including anything still in its write-ahead log
+
+    The log is checkpointed first, as its file keeps its largest size
+    until truncated.
+    """
+    app.get_db().execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    return sum(os.path.getsize(path) for path in (app.DATABASE_FILE, app.DATABASE_FILE + '-wal')
+               if os.path.exists(path))
+
+def bench_leaderboard(size, samples):
+    """Time persistence and leaderboard reads with `size` players stored"""
+    entries = [synthetic_entry(i) for i in range(size)]
+    _, seed_peak = peak_memory(app.save_leaderboard, entries)
+    _, seed_seconds = timed(app.save_leaderboard, entries)
+    client = app.app.test_client()
+
+    writes = []
+    for i in range(samples):
+        entry = synthetic_entry(random.randrange(size))
+        _, elapsed = timed(app.record_submission, entry['user'], entry['api_name'],
+                           entry['results'], entry['test_logs'])
+        writes.append(elapsed)
+    entry = synthetic_entry(random.randrange(size))
+    _, write_peak = peak_memory(app.record_submission, entry['user'], entry['api_name'],
+                                entry['results'], entry['test_logs'])
+
+    _, load_seconds = timed(app.load_leaderboard)
+    _, load_peak = peak_memory(app.load_leaderboard)
+
+    # The first read after a write renders the page again; later reads hit the cached table
+    cold_pages = []
+    warm_pages = []
+    api_pages = []
+    for i in range(samples):
+        entry = synthetic_entry(random.randrange(size))
+        app.record_submission(entry['user'], entry['api_name'], entry['results'], entry['test_logs'])
+        _, elapsed = timed(client.get, '/leaderboard')
+        cold_pages.append(elapsed)
+        _, elapsed = timed(client.get, '/leaderboard')
+        warm_pages.append(elapsed)
+        _, elapsed = timed(client.get, '/api/leaderboard?limit=50')
+        api_pages.append(elapsed)
+    entry = synthetic_entry(random.randrange(size))
+    app.record_submission(entry['user'], entry['api_name'], entry['results'], entry['test_logs'])
+    _, page_peak = peak_memory(client.get, '/leaderboard')
+
+    return {
+        'players': size,
+        'seed_seconds': round(seed_seconds, 3),
+        'seed_peak_memory_kb': round(seed_peak / 1024, 1),
+        'record_submission': summarize_timings(writes),
+        'record_submission_peak_memory_kb': round(write_peak / 1024, 1),
+        'load_leaderboard_seconds': round(load_seconds, 3),
+        'load_leaderboard_peak_memory_kb': round(load_peak / 1024, 1),
+        'leaderboard_page_after_write': summarize_timings(cold_pages),
+        'leaderboard_page_cached': summarize_timings(warm_pages),
+        'api_leaderboard_cached': summarize_timings(api_pages),
+        'leaderboard_page_peak_memory_kb': round(page_peak / 1024, 1),
+        'database_bytes': database_bytes(),
+    }
+
+def print_report(report):
+    """Print the headline numbers of a benchmark report"""
+    print('\ntest_endpoint()')
+    for row in report['test_endpoint']:
+        print(f"  {row['profile']:<8} {row['runs_per_second']:>8} runs/s  "
+              f"probe p50 {row['probe_latency'].get('p50_ms', '-')} ms  "
+              f"p99 {row['probe_latency'].get('p99_ms', '-')} ms  "
+              f"peak {row['peak_memory_kb']} KB")
+    print('\n/test submissions')
+    for row in report['submissions']:
+        print(f"  {row['profile']:<8} {row['jobs_per_second']:>8} jobs/s  "
+              f"accept p50 {row['accept_latency'].get('p50_ms', '-')} ms  "
+              f"({row['accepted']}/{row['submitted']} accepted, {row['unfinished']} unfinished)")
+    print('\nleaderboard')
+    for row in report['leaderboard']:
+        print(f"  {row['players']:>7} players  "
+              f"write p50 {row['record_submission']['p50_ms']} ms  "
+              f"page after write p50 {row['leaderboard_page_after_write']['p50_ms']} ms  "
+              f"cached p50 {row['leaderboard_page_cached']['p50_ms']} ms  "
+              f"load {row['load_leaderboard_seconds']} s  "
+              f"db {row['database_bytes'] // 1024} KB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000, 100000],
+                        help='leaderboard sizes to benchmark')
+    parser.add_argument('--profiles', nargs='+', default=list(PROFILES), choices=list(PROFILES),
+                        help='mock API profiles to test against')
+    parser.add_argument('--runs', type=int, default=5, help='test_endpoint() runs per profile')
+    parser.add_argument('--rounds', type=int, default=3, help='rounds per test_endpoint() run')
+    parser.add_argument('--samples', type=int, default=20, help='timed operations per leaderboard size')
+    parser.add_argument('--submissions', type=int, default=10, help='/test submissions per profile')
+    parser.add_argument('--quick', action='store_true', help='small sizes and few runs for a smoke check')
+    parser.add_argument('--output', default='benchmark_results.json', help='where to write the JSON report')
+    args = parser.parse_args()
+
+    if args.quick:
+        args.sizes = [10, 1000]
+        args.runs = 2
+        args.rounds = 1
+        args.samples = 5
+        args.submissions = 3
+        args.profiles = ['fast', 'flaky']
+
+    random.seed(1234)
+    app.ENDPOINT_TIMEOUTS = {endpoint: BENCH_TIMEOUT for endpoint in app.ENDPOINTS}
+
+    report = {
+        'started': datetime.now().isoformat(),
+        'settings': vars(args),
+        'test_endpoint': [bench_test_endpoint(profile, args.runs, args.rounds) for profile in args.profiles],
+        'submissions': [bench_submissions(profile, args.submissions) for profile in args.profiles],
+        'leaderboard': [bench_leaderboard(size, args.samples) for size in args.sizes],
+    }
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f'\nFull results written to {args.output}')
+
+if __name__ == '__main__':
+    main()
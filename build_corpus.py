@@ -0,0 +1,338 @@
+"""Build test_corpus.json, the test cases the tester samples from.
+
+Cases are composed from the phrase banks below, so the corpus is large
+enough that participants cannot hard-code answers, yet fully
+reproducible: the same banks and seed always produce the same file.
+Bump CORPUS_VERSION whenever the output changes, because stored runs
+record the corpus version their seed was drawn against.
+
+    python build_corpus.py [--per-label 2000] [--output test_corpus.json]
+"""
+import argparse
+import itertools
+import json
+import random
+
+CORPUS_VERSION = 1
+SEED = 20240611
+
+# The original hand-picked cases always lead their label
+ORIGINAL_CASES = {
+    "analyze-mood": {
+        "happy": [
+            "I feel amazing today!",
+            "I'm so excited about this weekend",
+            "What a wonderful surprise, I'm thrilled!",
+            "This is the best day ever",
+            "I'm feeling incredibly joyful right now"
+        ],
+        "sad": [
+            "I'm feeling down today",
+            "This news has made me very unhappy",
+            "I can't stop crying about what happened",
+            "Everything seems so depressing lately",
+            "I'm really disappointed with the outcome"
+        ],
+        "angry": [
+            "This is absolutely infuriating",
+            "I'm so mad I could scream",
+            "Why does this always happen to me?!",
+            "They completely disrespected me",
+            "I can't believe how frustrating this is"
+        ],
+        "neutral": [
+            "The sky is blue today",
+            "I'm going to the store later",
+            "The meeting is scheduled for 3pm",
+            "The book has 250 pages",
+            "The car is parked outside"
+        ]
+    },
+    "detect-crisis": {
+        "true": [
+            "I'm feeling hopeless and might hurt myself",
+            "I don't see any reason to continue living",
+            "Everyone would be better off without me",
+            "I've been thinking about ending it all",
+            "I can't take this pain anymore, I want to die"
+        ],
+        "false": [
+            "I had a bad day but tomorrow will be better",
+            "This homework is really difficult",
+            "My friend didn't respond to my text",
+            "The traffic was terrible this morning",
+            "I spilled coffee on my new shirt"
+        ]
+    },
+    "summarize": {
+        "passage": [
+            "Climate change is the long-term alteration in Earth's climate and weather patterns. It is caused by human activities, particularly the burning of fossil fuels, which leads to increased levels of greenhouse gases in the atmosphere. These gases trap heat, causing global warming. The effects of climate change include rising sea levels, extreme weather events, loss of biodiversity, and threats to food security.",
+            "Artificial intelligence refers to the simulation of human intelligence in machines that are programmed to think and learn like humans. It encompasses various technologies like machine learning, natural language processing, and computer vision. AI systems can analyze data, recognize patterns, make decisions, and improve over time based on experience. While AI offers numerous benefits in healthcare, transportation, and many other fields, it also raises concerns about privacy, security, and potential job displacement.",
+            "The history of space exploration began in the mid-20th century, with the Soviet Union launching the first artificial satellite, Sputnik 1, in 1957. This was followed by the first human in space, Yuri Gagarin, in 1961. The United States responded with the Apollo program, landing Neil Armstrong and Buzz Aldrin on the Moon in 1969. Since then, numerous countries have sent probes to explore the planets, and the International Space Station has been continuously occupied since 2000, representing a global collaboration in space research.",
+            "The internet evolved from ARPANET, a network created by the U.S. Department of Defense in the 1960s. It gained popularity in the 1990s with the creation of the World Wide Web. Today, the internet connects billions of devices worldwide, facilitating information sharing, communication, commerce, entertainment, and social networking. It has revolutionized how we work, learn, and interact with each other.",
+            "Renewable energy sources, such as solar, wind, hydroelectric, and geothermal power, are derived from naturally replenishing resources. Unlike fossil fuels, they produce minimal greenhouse gas emissions and have a smaller environmental impact. The adoption of renewable energy is growing globally as technology improves and costs decrease, playing a crucial role in addressing climate change and creating a sustainable energy future."
+        ]
+    }
+}
+
+OPENERS = ["", "Honestly, ", "Right now ", "Today ", "Tonight ", "This morning ", "After this week ",
+           "Ever since Monday ", "To be honest, ", "Lately "]
+
+MOOD_BANKS = {
+    "happy": {
+        "feelings": ["I feel amazing", "I'm so excited", "I'm absolutely thrilled", "I feel wonderful",
+                     "I'm overjoyed", "I'm really happy", "I feel fantastic", "I'm delighted",
+                     "I'm grinning from ear to ear", "I couldn't be happier", "I'm on top of the world",
+                     "I'm full of joy"],
+        "reasons": ["about the weekend", "because I passed my exam", "since I got the job",
+                    "after seeing my old friends", "about our trip to the coast", "because the project launched",
+                    "now that summer is here", "about the surprise party", "because my sister had her baby",
+                    "after the concert last night", "about my new apartment", "because we won the match",
+                    "after that lovely dinner", "since my garden finally bloomed", "about the good news"],
+        "endings": ["!", ".", "!!", " :)"]
+    },
+    "sad": {
+        "feelings": ["I'm feeling down", "I feel so sad", "I'm really unhappy", "I can't stop crying",
+                     "I feel heartbroken", "I'm so disappointed", "I feel miserable", "I'm feeling really low",
+                     "Everything feels gloomy", "I feel empty and sad", "I'm so upset", "I feel lonely and blue"],
+        "reasons": ["about what happened", "since my dog passed away", "because I failed the test",
+                    "after the breakup", "because my best friend moved away", "about losing the game",
+                    "since I didn't get the job", "about the bad news from home", "because nobody came to my party",
+                    "after the funeral", "because the trip got cancelled", "about my grandmother's illness",
+                    "since the rain ruined our plans", "because I lost my wallet", "about how things ended"],
+        "endings": [".", "...", ". ", " :("]
+    },
+    "angry": {
+        "feelings": ["I'm so mad", "This is absolutely infuriating", "I'm furious", "I'm really angry",
+                     "This makes my blood boil", "I'm livid", "I'm fed up", "I'm so frustrated",
+                     "I could scream", "This is outrageous", "I'm seething", "I'm beyond annoyed"],
+        "reasons": ["that they ignored me again", "about the rude customer", "because the landlord lied to me",
+                    "that my flight got cancelled without notice", "because they took credit for my work",
+                    "about being overcharged", "that nobody listens to me", "because the package was stolen",
+                    "about the broken promises", "that they cut in line", "because my coworker disrespected me",
+                    "about the unfair decision", "that the referee cheated", "because they wasted my time",
+                    "that this keeps happening"],
+        "endings": ["!", "!!", "!?", "."]
+    },
+    "neutral": {
+        "openers": ["", "Just so you know, ", "For reference, ", "Reminder: ", "FYI, ", "Note that "],
+        "subjects": ["The meeting", "The train", "The library", "The package", "The store", "The bus",
+                     "The lecture", "The dentist appointment", "The report", "The museum", "The conference call",
+                     "The grocery delivery"],
+        "predicates": ["is scheduled for 3pm", "arrives at platform four", "opens at nine",
+                       "was delivered on Tuesday", "closes early on Sundays", "leaves every twenty minutes",
+                       "takes place in room 204", "has been moved to Thursday", "is twelve pages long",
+                       "is located on Main Street", "starts after lunch", "is listed in the calendar",
+                       "was updated yesterday", "is on the second floor", "runs until five"],
+        "endings": [".", " this week.", " according to the schedule.", " as usual."]
+    }
+}
+
+CRISIS_BANKS = {
+    "true": {
+        "openers": ["", "Lately ", "Honestly, ", "Every night ", "Since the breakup ", "For weeks now ",
+                    "I need to say this: ", "Most days ", "After everything, ", "These days ",
+                    "Ever since I lost my job ", "Tonight "],
+        "cores": ["I feel hopeless and might hurt myself", "I don't see any reason to continue living",
+                  "I think everyone would be better off without me", "I've been thinking about ending it all",
+                  "I can't take this pain anymore and I want to die", "I've been planning how to kill myself",
+                  "I don't want to be alive anymore", "I keep thinking about taking my own life",
+                  "I feel like there's no way out except suicide", "I wish I could just disappear forever",
+                  "I've started giving away my things because I won't need them",
+                  "I want to end my life", "I have thoughts of hurting myself every day",
+                  "nothing matters and I want to die", "I wrote a goodbye letter to my family",
+                  "I don't think I'll be here much longer"],
+        "tails": ["", " and I don't know what to do", " and nobody would even notice", " and I feel so alone",
+                  " and I can't stop these thoughts", " and I have no one to talk to", " and it scares me",
+                  " and I'm so tired of everything", " and I can't see a future", " and I feel trapped",
+                  " and the pain never stops", " and I've made up my mind"]
+    },
+    "false": {
+        "openers": ["", "Ugh, ", "Honestly, ", "Today ", "This morning ", "Yesterday ", "Well, ",
+                    "So annoying: ", "Long story short, ", "Just my luck, ", "On the bright side, ", "Lately "],
+        "cores": ["I had a bad day", "this homework is really difficult", "my friend didn't respond to my text",
+                  "the traffic was terrible", "I spilled coffee on my new shirt", "my phone battery died",
+                  "I missed the bus", "the printer jammed again", "my team lost the game",
+                  "I burned the toast", "the wifi keeps dropping", "I forgot my umbrella",
+                  "my presentation ran long", "I overslept this morning", "the café was out of croissants",
+                  "my plants are wilting"],
+        "tails": ["", " but tomorrow will be better", " but I'll manage", " so I'm a bit grumpy",
+                  " but it's not a big deal", " and I need a nap", " but my friends cheered me up",
+                  " but I'm looking forward to the weekend", " so I ordered pizza", " but I'll fix it later",
+                  " and now I'm laughing about it", " but life goes on"]
+    }
+}
+
+# Topic sentence banks; passages join the lead sentence with 2-5 others
+SUMMARY_TOPICS = [
+    ["Coral reefs are among the most diverse ecosystems on the planet.",
+     "They cover less than one percent of the ocean floor yet support about a quarter of all marine species.",
+     "Reefs are built over centuries by tiny animals called coral polyps that secrete calcium carbonate.",
+     "Warming seas cause corals to expel the algae living in their tissues, a process known as bleaching.",
+     "Pollution, overfishing and coastal development add further stress to already fragile reefs.",
+     "Healthy reefs protect shorelines from storms and support fishing and tourism economies.",
+     "Scientists are experimenting with heat-resistant corals and reef restoration nurseries.",
+     "Marine protected areas have shown that reefs can recover when local pressures are reduced."],
+    ["The printing press was developed by Johannes Gutenberg around 1440.",
+     "Before it, books were copied by hand, which made them rare and expensive.",
+     "Movable metal type allowed pages to be composed and printed quickly and consistently.",
+     "Within decades, printing shops had spread to hundreds of European cities.",
+     "The cheaper books helped literacy rise and allowed new ideas to circulate widely.",
+     "Printed pamphlets played a central role in the religious and political debates of the era.",
+     "Standardized texts also helped fix spelling and grammar in many languages.",
+     "Historians often rank the printing press among the most influential inventions in history."],
+    ["Sleep is essential for both physical and mental health.",
+     "Adults generally need between seven and nine hours of sleep each night.",
+     "During deep sleep the body repairs tissue and strengthens the immune system.",
+     "Dreaming sleep appears to play an important role in memory and emotional processing.",
+     "Chronic sleep deprivation is linked to heart disease, obesity and depression.",
+     "Screens emit blue light that can delay the release of the sleep hormone melatonin.",
+     "Keeping a regular schedule and a cool, dark bedroom improves sleep quality.",
+     "Many workplaces now recognize that well-rested employees are safer and more productive."],
+    ["Honeybees are vital pollinators for many of the crops humans eat.",
+     "A single colony can contain tens of thousands of worker bees led by one queen.",
+     "Workers communicate the location of flowers through a movement called the waggle dance.",
+     "In recent decades beekeepers have reported alarming losses of entire colonies.",
+     "Pesticides, parasites such as the varroa mite, and habitat loss all contribute to the decline.",
+     "Farmers increasingly rent hives to pollinate orchards and fields during the blooming season.",
+     "Planting wildflowers and reducing pesticide use can help bee populations recover.",
+     "Wild bees, which receive less attention, are also essential to healthy ecosystems."],
+    ["The Great Wall of China is a series of fortifications built over many centuries.",
+     "Early walls were constructed as far back as the seventh century BC.",
+     "The best-known sections were built during the Ming dynasty using brick and stone.",
+     "The wall was designed to protect against raids from nomadic groups to the north.",
+     "Watchtowers along the wall allowed soldiers to send signals using smoke and fire.",
+     "Including all its branches, the wall stretches for more than twenty thousand kilometers.",
+     "Today it is one of the most visited tourist attractions in the world.",
+     "Erosion and tourism have damaged parts of the wall, prompting conservation efforts."],
+    ["Electric vehicles are becoming an increasingly common sight on the roads.",
+     "They run on rechargeable batteries instead of gasoline or diesel engines.",
+     "Because they have no tailpipe, they produce no direct exhaust emissions.",
+     "Battery prices have fallen sharply over the past decade, making the cars more affordable.",
+     "Range anxiety remains a concern for drivers in areas with few charging stations.",
+     "Governments are offering incentives and investing in public charging networks.",
+     "The environmental benefit depends partly on how the electricity is generated.",
+     "Many carmakers have announced plans to phase out combustion engines entirely."],
+    ["Volcanoes form where molten rock from deep within the Earth reaches the surface.",
+     "Most are found along the boundaries of tectonic plates, such as the Pacific Ring of Fire.",
+     "Eruptions can range from gentle lava flows to violent explosions of ash and gas.",
+     "Volcanic ash can disrupt air travel and damage crops far from the eruption.",
+     "Over time, volcanic soils become extremely fertile, attracting farming communities.",
+     "Scientists monitor earthquakes, ground swelling and gas emissions to forecast eruptions.",
+     "Some volcanic islands, like Hawaii and Iceland, were built entirely by eruptions.",
+     "Large eruptions can even cool the global climate for a year or more."],
+    ["Remote work expanded dramatically in the early 2020s.",
+     "Many employees discovered they could do their jobs effectively from home.",
+     "Companies saved money on office space while workers saved time on commuting.",
+     "Video calls and collaboration software became part of everyday working life.",
+     "Some people struggled with isolation and the blurred line between work and home.",
+     "Managers had to learn new ways to measure performance and keep teams connected.",
+     "Hybrid arrangements that mix office and home days have become a popular compromise.",
+     "The shift has also changed housing markets as people moved away from expensive cities."],
+    ["The human brain contains roughly eighty-six billion neurons.",
+     "Neurons communicate through electrical signals and chemical messengers called neurotransmitters.",
+     "Different regions of the brain specialize in functions such as vision, language and movement.",
+     "The brain remains adaptable throughout life, a property known as neuroplasticity.",
+     "Learning new skills creates and strengthens connections between neurons.",
+     "Regular exercise and social activity are associated with better brain health in old age.",
+     "Brain imaging technologies allow researchers to observe activity in real time.",
+     "Despite great progress, many aspects of consciousness remain poorly understood."],
+    ["Recycling turns waste materials into new products.",
+     "It reduces the need to extract raw materials such as timber, water and minerals.",
+     "Aluminum cans can be recycled repeatedly without losing quality.",
+     "Contaminated recycling, such as greasy pizza boxes, can spoil entire batches.",
+     "Many countries have struggled since major importers stopped accepting foreign plastic waste.",
+     "Reducing and reusing items is generally even better for the environment than recycling.",
+     "Some cities have introduced deposit schemes that pay people to return bottles.",
+     "Clear labeling helps households sort their waste correctly."],
+    ["The Olympic Games trace their origins to ancient Greece.",
+     "The ancient games were held in Olympia in honor of the god Zeus.",
+     "The modern Olympics were revived in 1896 in Athens by Pierre de Coubertin.",
+     "Today thousands of athletes from more than two hundred nations compete.",
+     "The Winter Olympics were introduced in 1924 to showcase snow and ice sports.",
+     "Hosting the games requires enormous investment in stadiums and infrastructure.",
+     "Critics argue that host cities are often left with debt and unused venues.",
+     "Supporters say the games promote international friendship and inspire young athletes."],
+    ["Antibiotics are medicines that kill or slow the growth of bacteria.",
+     "Penicillin, discovered by Alexander Fleming in 1928, was the first widely used antibiotic.",
+     "Antibiotics transformed medicine, making many once-deadly infections easily treatable.",
+     "Overuse and misuse have allowed resistant strains of bacteria to spread.",
+     "Antibiotic resistance now causes hundreds of thousands of deaths each year worldwide.",
+     "Antibiotics do not work against viruses such as those that cause colds and flu.",
+     "Researchers are searching for new drugs and alternative treatments like bacteriophages.",
+     "Finishing prescribed courses and avoiding unnecessary use help slow resistance."]
+]
+
+def compose(parts_lists, rng, count, joiner):
+    """Pick `count` distinct combinations of the given phrase lists"""
+    combos = list(itertools.product(*parts_lists))
+    rng.shuffle(combos)
+    return [joiner(combo) for combo in combos[:count]]
+
+def capitalize(text):
+    return text[:1].upper() + text[1:]
+
+def follow(opener, phrase):
+    """Lower-case the first letter of a phrase that follows an opener, except "I"."""
+    if not opener or phrase.split()[0].split("'")[0] == "I":
+        return phrase
+    return phrase[:1].lower() + phrase[1:]
+
+def build_corpus(per_label, seed=SEED):
+    """Build the corpus dict: endpoint -> label -> list of texts"""
+    rng = random.Random(seed)
+    corpus = {"version": CORPUS_VERSION, "analyze-mood": {}, "detect-crisis": {}, "summarize": {}}
+
+    for label, bank in MOOD_BANKS.items():
+        original = ORIGINAL_CASES["analyze-mood"][label]
+        if label == "neutral":
+            parts = [bank["openers"], bank["subjects"], bank["predicates"], bank["endings"]]
+        else:
+            parts = [OPENERS, bank["feelings"], bank["reasons"], bank["endings"]]
+        joiner = lambda combo: capitalize(f"{combo[0]}{follow(combo[0], combo[1])} {combo[2]}{combo[3]}")
+        generated = [text for text in compose(parts, rng, per_label, joiner) if text not in original]
+        corpus["analyze-mood"][label] = original + generated[:per_label - len(original)]
+
+    for label, bank in CRISIS_BANKS.items():
+        original = ORIGINAL_CASES["detect-crisis"][label]
+        parts = [bank["openers"], bank["cores"], bank["tails"]]
+        joiner = lambda combo: capitalize(f"{combo[0]}{combo[1]}{combo[2]}")
+        generated = [text for text in compose(parts, rng, per_label, joiner) if text not in original]
+        corpus["detect-crisis"][label] = original + generated[:per_label - len(original)]
+
+    # Every lead-plus-body combination, capped at per_label
+    generated = [" ".join([topic[0]] + list(body))
+                 for topic in SUMMARY_TOPICS
+                 for size in range(2, 6)
+                 for body in itertools.combinations(topic[1:], size)]
+    rng.shuffle(generated)
+    generated = generated[:per_label - len(ORIGINAL_CASES["summarize"]["passage"])]
+    corpus["summarize"]["passage"] = ORIGINAL_CASES["summarize"]["passage"] + generated
+
+    return corpus
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--per-label', type=int, default=2000, help='texts per label')
+    parser.add_argument('--output', default='test_corpus.json', help='where to write the corpus')
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.per_label)
+    with open(args.output, 'w') as f:
+        # One text per line keeps diffs readable without pretty-printing everything
+        f.write('{\n"version": %d' % corpus["version"])
+        for endpoint in ("analyze-mood", "detect-crisis", "summarize"):
+            f.write(',\n%s: {' % json.dumps(endpoint))
+            for i, (label, texts) in enumerate(corpus[endpoint].items()):
+                f.write('%s\n  %s: [\n' % (',' if i else '', json.dumps(label)))
+                f.write(',\n'.join('    ' + json.dumps(text, ensure_ascii=False) for text in texts))
+                f.write('\n  ]')
+            f.write('\n}')
+        f.write('\n}\n')
+
+    for endpoint in ("analyze-mood", "detect-crisis", "summarize"):
+        counts = ', '.join(f'{label}: {len(texts)}' for label, texts in corpus[endpoint].items())
+        print(f'{endpoint}: {counts}')
+
+if __name__ == '__main__':
+    main()
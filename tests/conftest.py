@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep anything the app writes out of the working tree
+os.environ.setdefault('DATABASE_FILE', os.path.join(tempfile.mkdtemp(prefix='sentiment-tests-'), 'tester.db'))
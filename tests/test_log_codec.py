@@ -0,0 +1,52 @@
+"""Round trips through the compact test log format"""
+import app
+
+
+def corpus_entry(endpoint, test_num, text_id, **fields):
+    """A log entry shaped like run_probe() output for a corpus text"""
+    return dict(endpoint=endpoint, test_num=test_num, text_id=text_id,
+                text=app.truncate(app.CORPUS_TEXTS[text_id], 50), **fields)
+
+
+def sample_logs():
+    timing = {'dns': 1.2, 'connect': 0.4, 'tls': 0.0, 'ttfb': 120.5, 'body': 0.3,
+              'request_bytes': 48, 'response_bytes': 21, 'reused': False}
+    return [
+        {'round': 1, 'score': 12, 'logs': [
+            corpus_entry('analyze-mood', 1, 0, expected='happy', predicted='happy', status='CORRECT',
+                         latency=0.12, timing=timing, speed_bonus='FAST'),
+            corpus_entry('detect-crisis', 1, 5, expected=True, predicted=False, status='INCORRECT',
+                         latency=1.5, timing=dict(timing, reused=True), speed_bonus='MEDIUM', cached=True),
+            corpus_entry('summarize', 1, 9, summary='A short summary.', status='GOOD', latency=2.5,
+                         timing=timing),
+            corpus_entry('analyze-mood', 2, 3, expected='sad', status='ERROR', error='Read timed out.'),
+            corpus_entry('detect-crisis', 2, 7, expected=False, status='SKIPPED',
+                         error='Skipped: 5 probes in a row got no response'),
+        ]},
+    ]
+
+
+def test_round_trip():
+    logs = sample_logs()
+    assert app.decode_test_logs(app.encode_test_logs(logs)) == logs
+
+
+def test_failed_round_error_entry():
+    logs = sample_logs() + [{'round': 2, 'score': 0, 'logs': [{'error': 'Round 2 failed: boom'}]}]
+    assert app.decode_test_logs(app.encode_test_logs(logs)) == logs
+
+
+def test_legacy_text_only_entry():
+    # Logs from before corpus ids carry their text and no text_id
+    entry = {'endpoint': 'analyze-mood', 'test_num': 1, 'text': 'I feel amazing today!', 'expected': 'happy',
+             'predicted': 'happy', 'status': 'CORRECT', 'latency': 0.3, 'speed_bonus': 'FAST'}
+    logs = [{'round': 1, 'score': 5, 'logs': [entry]}]
+    assert app.decode_test_logs(app.encode_test_logs(logs)) == logs
+
+
+def test_corpus_version_mismatch(monkeypatch):
+    blob = app.encode_test_logs(sample_logs())
+    monkeypatch.setattr(app, 'CORPUS_VERSION', app.CORPUS_VERSION + 1)
+    entry = app.decode_test_logs(blob)[0]['logs'][0]
+    assert entry['text_id'] == 0
+    assert entry['text'] == f'corpus v{app.CORPUS_VERSION - 1} text #0'
@@ -0,0 +1,18 @@
+"""ProbeBreaker adaptive timeouts and budget"""
+import app
+
+
+def test_adaptive_timeout_never_cuts_off_a_bonus():
+    breaker = app.ProbeBreaker()
+    for endpoint in app.ENDPOINTS:
+        breaker.record(endpoint, 0.01)
+        assert breaker.timeout(endpoint) >= app.SPEED_THRESHOLDS[endpoint][1]
+    breaker.record('summarize', 0.5)
+    assert breaker.timeout('summarize') == 4.0
+
+
+def test_adaptive_timeout_tracks_slowest_answer():
+    breaker = app.ProbeBreaker()
+    assert breaker.timeout('analyze-mood') == app.ENDPOINT_TIMEOUTS['analyze-mood']
+    breaker.record('analyze-mood', 2.0)
+    assert breaker.timeout('analyze-mood') == 8.0
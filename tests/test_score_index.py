@@ -0,0 +1,78 @@
+"""ScoreIndex ranks against a brute-force count"""
+import random
+import threading
+
+import app
+
+
+def brute_rank(scores, score):
+    return sum(1 for other in scores if other > score) + 1
+
+
+def test_ties_share_a_rank():
+    index = app.ScoreIndex(version=0)
+    for score in (10, 20, 20, 5):
+        index.add(score)
+    assert [index.rank(score) for score in (25, 20, 10, 5, 0)] == [1, 1, 3, 4, 5]
+    assert index.players == 4
+
+
+def test_removal():
+    index = app.ScoreIndex(version=0)
+    for score in (10, 20, 20):
+        index.add(score)
+    index.add(20, -1)
+    assert index.rank(10) == 2
+    assert index.players == 2
+
+
+def test_growth_past_initial_size():
+    rng = random.Random(7)
+    index = app.ScoreIndex(version=0, size=1024)
+    scores = [rng.randrange(1000) for _ in range(200)]
+    for score in scores:
+        index.add(score)
+    # Scores beyond the initial size make the tree grow (twice here)
+    for score in (1024, 3000, 3000, 1500):
+        index.add(score)
+        scores.append(score)
+    assert len(index.counts) == 4096
+    for score in set(scores) | {0, 1023, 1024, 2999, 5000}:
+        assert index.rank(score) == brute_rank(scores, score)
+
+
+def add_player(user_name, score, committed=None):
+    results = {'total_score': score, 'total_correct': 1, 'total_tests': 1, 'rounds_tested': 1,
+               'timestamp': '2024-01-01T00:00:00'}
+    with app.transaction() as db:
+        if committed is not None:
+            app.after_commit(committed.set)
+        app.update_or_add_player(db, user_name, 'API', results, [])
+
+
+def test_rebuild_racing_a_write_counts_it_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'DATABASE_FILE', str(tmp_path / 'tester.db'))
+    monkeypatch.setattr(app, 'HISTORY_DIR', str(tmp_path / 'history'))
+    monkeypatch.setattr(app, 'LEADERBOARD_FILE', str(tmp_path / 'leaderboard.json'))
+    monkeypatch.setattr(app, '_score_index', None)
+    add_player('first', 10)
+
+    # Commit a second player's write after the rebuild has read the
+    # version but before it counts the players
+    committed = threading.Event()
+    writer = threading.Thread(target=add_player, args=('second', 20, committed))
+
+    class RacingScoreIndex(app.ScoreIndex):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            if not writer.is_alive() and not committed.is_set():
+                writer.start()
+                assert committed.wait(5)
+
+    monkeypatch.setattr(app, 'ScoreIndex', RacingScoreIndex)
+    app.get_score_index()
+    writer.join(5)
+
+    index = app.get_score_index()
+    assert index.players == 2
+    assert index.rank(20) == 1 and index.rank(10) == 2